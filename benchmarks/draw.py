@@ -0,0 +1,83 @@
+"""
+Microbenchmark of the entity draw path, over a screen full of multi-part lasers.
+
+By default `pyxel.blt` is replaced with a no-op, so only the Python-side cost of drawing is measured,
+and no window is needed. Pass `--window` to initialize pyxel and measure real blits.
+Run from the repository root:
+
+    python -m benchmarks.draw
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+
+import pyxel
+
+from src.core import consts
+from src.core.assets import assets
+from src.core.rng import Rng
+from src.entities.concrete.lasers import LASER_MAKERS
+from src.entities.entity import Entity
+
+DEFAULT_FRAMES = 500
+LASER_SPACING = 16  # Horizontal distance between lasers
+
+
+def make_screen(seed: int) -> list[Entity]:
+    """Return lasers of every kind, spread over the whole screen."""
+    rng = Rng(seed)
+    lasers: list[Entity] = []
+    for i, x in enumerate(range(0, consts.W, LASER_SPACING)):
+        maker = LASER_MAKERS[i % len(LASER_MAKERS)]
+        for laser in maker(6, rng):
+            laser.rect.x = x
+            lasers.append(laser)
+    return lasers
+
+
+def draw_with_asdict(entity: Entity):
+    """The previous draw path, which built the blit arguments with `asdict` for every part."""
+    for part in entity.parts:
+        offset_x, offset_y = part.offset
+        frame = asdict(part.frame_manager.frame)
+        del frame["blt_args"]
+        pyxel.blt(entity.rect.x + offset_x, entity.rect.y + offset_y, **frame)
+
+
+def draw_current(entity: Entity):
+    entity.draw()
+
+
+def time_draw(draw: Callable[[Entity], None], lasers: list[Entity], frames: int) -> float:
+    """Return the mean time per frame, in microseconds."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        for laser in lasers:
+            draw(laser)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--window", action="store_true", help="initialize pyxel and measure real blits")
+    args = parser.parse_args()
+
+    if args.window:
+        pyxel.init(consts.W, consts.H)
+        assets.load_resources("res.pyxres")
+    else:
+        pyxel.blt = lambda *_args, **_kwargs: None
+
+    lasers = make_screen(args.seed)
+    parts = sum(len(laser.parts) for laser in lasers)
+    print(f"{len(lasers)} lasers, {parts} parts per frame")
+    for name, draw in (("asdict", draw_with_asdict), ("current", draw_current)):
+        print(f"{name:>8}: {time_draw(draw, lasers, args.frames):8.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
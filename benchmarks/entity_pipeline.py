@@ -0,0 +1,185 @@
+"""
+Benchmarks the entity pipeline (spawning, movement, collisions and removal) under scripted spawn densities.
+
+Each scenario drives an EntityManager headlessly with a fixed seed, and a player that stays in place
+and fires bullets at a fixed rate. Reports frames per second, bytes allocated per frame
+(the peak allocation within a frame, on average) and peak traced memory,
+and compares them against a stored baseline.
+
+Frames per second are computed from the median CPU time of several passes, since single passes
+vary widely from run to run. Memory is traced over a separate pass of a new EntityManager,
+whose entity pools start empty like in every new session, so filling them counts towards the peak.
+Run from the repository root:
+
+    python -m benchmarks.entity_pipeline
+    python -m benchmarks.entity_pipeline --save-baseline
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import NamedTuple
+
+from src.core.array_store import ArrayStore
+from src.core.clock import Clock
+from src.core.entity_manager import EntityManager, SpawnSettings
+from src.core.rng import Rng
+from src.core.sounds import Sounds
+from src.entities.concrete.lasers import bake_collision_masks, make_diagonal1, make_diagonal2, make_diagonals
+from src.entities.concrete.player import Player, PlayerPlayState
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_FRAMES = 2000
+DEFAULT_REPEATS = 5  # Timed passes, of which the median is reported
+DEFAULT_TOLERANCE = 0.1  # Relative change in memory that is reported as a regression
+# Relative change in fps that is reported as a regression. Even the median of several passes
+# varies by about 20% from run to run on a busy machine, while memory is deterministic.
+DEFAULT_FPS_TOLERANCE = 0.3
+
+
+class Scenario(NamedTuple):
+    spawn_settings: SpawnSettings
+    bullet_period: int  # Frames between bullet bursts, 0 for no bullets
+    pixel_masks: bool = False
+
+
+# Only diagonal lasers, and nothing else, spawned often
+DIAGONALS = SpawnSettings(
+    projectile_spawn_chance=0,
+    coins_spawn_chance=0,
+    spawn_period=4,
+    laser_makers=(make_diagonal1, make_diagonal2, make_diagonals),
+)
+
+SCENARIOS = {
+    "default": Scenario(SpawnSettings(), 3),
+    "dense": Scenario(SpawnSettings(projectile_spawn_chance=100, coins_spawn_chance=100, spawn_period=10), 1),
+    "stress": Scenario(SpawnSettings(projectile_spawn_chance=100, coins_spawn_chance=100, spawn_period=2), 1),
+    # Diagonal lasers colliding by their hitboxes, or by their collision masks
+    "diagonal": Scenario(DIAGONALS, 0),
+    "diagonal-masks": Scenario(DIAGONALS, 0, pixel_masks=True),
+}
+
+
+def make_pipeline(scenario: Scenario, seed: int, *, array_store: bool) -> tuple[EntityManager, Player]:
+    if scenario.pixel_masks:
+        bake_collision_masks(scenario.spawn_settings.laser_size_bounds)  # Outside of the timed frames
+    entity_manager = EntityManager(
+        clock=Clock(),
+        rng=Rng(seed),
+        store=ArrayStore() if array_store else None,
+        spawn_settings=scenario.spawn_settings,
+        pixel_masks=scenario.pixel_masks,
+        sounds=Sounds(muted=True),
+    )
+    player = Player(entity_manager)
+    player.set_state(PlayerPlayState)
+    player.rect.y = 80
+    return entity_manager, player
+
+
+def step(entity_manager: EntityManager, player: Player, scenario: Scenario):
+    if scenario.bullet_period and entity_manager.clock.frame_count % scenario.bullet_period == 0:
+        entity_manager.make_player_bullets(player.rect)
+    entity_manager.update_static()
+    entity_manager.update_scrollables(player)
+    entity_manager.end_frame()
+    entity_manager.clock.tick()
+
+
+def run(
+    scenario: Scenario, frames: int, seed: int, *, array_store: bool = False, repeats: int = DEFAULT_REPEATS
+) -> dict[str, float]:
+    # Timed passes, untraced
+    durations = []
+    for _ in range(repeats):
+        entity_manager, player = make_pipeline(scenario, seed, array_store=array_store)
+        gc.collect()
+        start = time.process_time()
+        for _ in range(frames):
+            step(entity_manager, player, scenario)
+        durations.append(time.process_time() - start)
+    fps = frames / statistics.median(durations)
+
+    # Traced pass, for allocations and memory
+    entity_manager, player = make_pipeline(scenario, seed, array_store=array_store)
+    gc.collect()
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    for _ in range(frames):
+        frame_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step(entity_manager, player, scenario)
+        frame_peak = tracemalloc.get_traced_memory()[1]
+        allocated += frame_peak - frame_start
+        peak = max(peak, frame_peak)
+    tracemalloc.stop()
+
+    return {"fps": fps, "bytes_per_frame": allocated / frames, "peak_bytes": peak}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    fps_tolerance: float,
+) -> bool:
+    """Print the change from the baseline, and return whether any metric regressed."""
+    regressed = False
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            if not base:
+                continue
+            change = (value - base) / base
+            # Higher is better for fps, lower is better for everything else
+            worse = -change if metric == "fps" else change
+            flag = "REGRESSION" if worse > (fps_tolerance if metric == "fps" else tolerance) else ""
+            regressed |= bool(flag)
+            print(f"{name:>14} {metric:>16}: {base:12.1f} -> {value:12.1f} ({change:+7.1%}) {flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run, out of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="timed passes per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="for memory")
+    parser.add_argument("--fps-tolerance", type=float, default=DEFAULT_FPS_TOLERANCE)
+    parser.add_argument("--array-store", action="store_true", help="keep entities in a NumPy ArrayStore")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        results[name] = run(SCENARIOS[name], args.frames, args.seed, array_store=args.array_store, repeats=args.repeats)
+        metrics = results[name]
+        print(
+            f"{name:>14}: {metrics['fps']:10.0f} fps {metrics['bytes_per_frame']:10.0f} B/frame "
+            f"{metrics['peak_bytes'] / 1024:8.0f} KiB peak"
+        )
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        args.baseline.write_text(json.dumps(baseline | results, indent=2) + "\n")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if compare(results, baseline, args.tolerance, args.fps_tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Audits the cold import time of a module, per imported module, using `python -X importtime`.
+
+Every run imports the module in a fresh interpreter, so nothing is cached in `sys.modules`.
+Reports the project's own modules by self time (the module's own body, excluding its imports),
+and the heaviest third-party and standard library imports by cumulative time.
+Run from the repository root:
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports src.core.main --runs 10
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import NamedTuple
+
+PROJECT_PACKAGES = ("src", "benchmarks")
+DEFAULT_MODULE = "src.core.game"
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 10
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: float
+    cumulative_us: float
+
+
+def measure(module: str) -> list[ImportTime]:
+    """Import `module` in a fresh interpreter, and parse the import times it reports."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times.append(ImportTime(name.strip(), float(self_us), float(cumulative_us)))
+    return times
+
+
+def audit(module: str, runs: int) -> dict[str, ImportTime]:
+    """The median import times of every module imported by `module`, over several runs."""
+    samples: dict[str, list[ImportTime]] = defaultdict(list)
+    for _ in range(runs):
+        for time in measure(module):
+            samples[time.module].append(time)
+    return {
+        name: ImportTime(
+            name,
+            statistics.median(time.self_us for time in times),
+            statistics.median(time.cumulative_us for time in times),
+        )
+        for name, times in samples.items()
+    }
+
+
+def is_project_module(name: str) -> bool:
+    return name.partition(".")[0] in PROJECT_PACKAGES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default=DEFAULT_MODULE)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="external imports to list")
+    args = parser.parse_args()
+
+    times = audit(args.module, args.runs)
+    total = times[args.module].cumulative_us
+    print(f"import {args.module}: {total / 1000:.1f} ms (median of {args.runs} cold runs)")
+
+    print("\nProject modules, by self time:")
+    project = sorted((t for t in times.values() if is_project_module(t.module)), key=lambda t: -t.self_us)
+    for time in project:
+        print(f"  {time.module:<40} {time.self_us / 1000:7.2f} ms self {time.cumulative_us / 1000:7.2f} ms total")
+
+    print(f"\nTop {args.top} external imports, by cumulative time:")
+    # Only top-level imports, since nested ones are included in their importer's cumulative time
+    external = sorted(
+        (t for t in times.values() if not is_project_module(t.module) and "." not in t.module),
+        key=lambda t: -t.cumulative_us,
+    )
+    for time in external[: args.top]:
+        print(f"  {time.module:<40} {time.cumulative_us / 1000:7.2f} ms total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measures the memory used per live entity, for each kind of spawned entity.
+
+Run from the repository root:
+
+    python -m benchmarks.memory
+"""
+
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Callable
+
+from src.core.rng import Rng
+from src.entities.concrete import (
+    bullet_pool,
+    coin_pool,
+    make_coins,
+    make_laser,
+    make_player_bullets,
+    make_projectile,
+    make_scientist,
+    projectile_pool,
+    scientist_pool,
+)
+from src.entities.entity import Entity, Rect
+
+DEFAULT_COUNT = 2000
+
+
+def _spawners(rng: Rng) -> dict[str, Callable[[], list[Entity]]]:
+    player_rect = Rect(40, 100, 12, 16)
+    coins, projectiles, scientists, bullets = coin_pool(), projectile_pool(), scientist_pool(), bullet_pool()
+    return {
+        "laser": lambda: make_laser(rng),
+        "coin": lambda: make_coins(rng, coins),
+        "projectile": lambda: [make_projectile(rng, projectiles)],
+        "scientist": lambda: [make_scientist(scientists)],
+        "player_bullet": lambda: make_player_bullets(player_rect, rng, bullets),
+    }
+
+
+def bytes_per_entity(spawn: Callable[[], list[Entity]], count: int) -> float:
+    """Spawn at least `count` live entities, and return the traced bytes allocated per entity."""
+    live: list[Entity] = []
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    while len(live) < count:
+        live.extend(spawn())
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(live)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="live entities to spawn per kind")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, spawn in _spawners(Rng(args.seed)).items():
+        print(f"{name:>14}: {bytes_per_entity(spawn, args.count):8.0f} bytes/entity")
+
+
+if __name__ == "__main__":
+    main()
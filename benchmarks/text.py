@@ -0,0 +1,125 @@
+"""
+Microbenchmark of the HUD's text drawing, with a score that changes every frame.
+
+Compares plain `pyxel.text`, which the app uses, against two caches of rasterized text:
+images of whole strings, re-rendered whenever the score changes, and a strip of digit glyphs,
+blitted one digit at a time after a pre-rendered label.
+Everything is drawn into an offscreen image instead of the screen, so no window is needed.
+Run from the repository root:
+
+    python -m benchmarks.text
+"""
+
+import argparse
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import pyxel
+
+from src.core import consts
+from src.core.assets import assets
+from src.core.main import SMALL_FONT
+from src.core.text_cache import text_width
+
+DEFAULT_FRAMES = 2000
+MAX_CACHED_STRINGS = 64
+HIGH_SCORE = 4321
+BUTTON_TEXT = "[ON] Music <M>"
+DIGITS = "0123456789"
+COLOR = 0
+COLKEY = 1  # A color other than the text's, for the transparent background of rendered text
+
+Draw = Callable[[int], None]
+
+
+def render(text: str) -> pyxel.Image:
+    """Rasterize a string into a new image, over a transparent background."""
+    image = pyxel.Image(text_width(SMALL_FONT, text), assets.font_height(SMALL_FONT))
+    image.cls(COLKEY)
+    image.text(0, 0, text, COLOR, assets.font(SMALL_FONT))
+    return image
+
+
+def plain_text() -> Draw:
+    font = assets.font(SMALL_FONT)
+
+    def draw(score: int):
+        pyxel.text(10, 1, f"Score: {score}", COLOR, font)
+        pyxel.text(240, 1, f"Best: {HIGH_SCORE}", COLOR, font)
+        pyxel.text(110, 1, BUTTON_TEXT, COLOR, font)
+
+    return draw
+
+
+def cached_strings() -> Draw:
+    """Blit whole strings from images, rendering every string not drawn recently."""
+    images: OrderedDict[str, pyxel.Image] = OrderedDict()
+
+    def draw_text(x: int, text: str):
+        image = images.get(text)
+        if image is None:
+            image = images[text] = render(text)
+            if len(images) > MAX_CACHED_STRINGS:
+                images.popitem(last=False)
+        else:
+            images.move_to_end(text)
+        pyxel.blt(x, 1, image, 0, 0, image.width, image.height, COLKEY)
+
+    def draw(score: int):
+        draw_text(10, f"Score: {score}")
+        draw_text(240, f"Best: {HIGH_SCORE}")
+        draw_text(110, BUTTON_TEXT)
+
+    return draw
+
+
+def cached_glyphs() -> Draw:
+    """Blit labels from images, and the numbers after them digit by digit from a strip of glyphs."""
+    labels = {text: render(text) for text in ("Score: ", "Best: ", BUTTON_TEXT)}
+    digits = render(DIGITS)
+    glyphs = {
+        digit: (text_width(SMALL_FONT, DIGITS[:i]), text_width(SMALL_FONT, digit)) for i, digit in enumerate(DIGITS)
+    }
+
+    def draw_label(x: int, text: str) -> int:
+        image = labels[text]
+        pyxel.blt(x, 1, image, 0, 0, image.width, image.height, COLKEY)
+        return x + image.width
+
+    def draw_number(x: int, value: int):
+        for digit in str(value):
+            u, width = glyphs[digit]
+            pyxel.blt(x, 1, digits, u, 0, width, digits.height, COLKEY)
+            x += width
+
+    def draw(score: int):
+        draw_number(draw_label(10, "Score: "), score)
+        draw_number(draw_label(240, "Best: "), HIGH_SCORE)
+        draw_label(110, BUTTON_TEXT)
+
+    return draw
+
+
+def time_draw(draw: Draw, frames: int) -> float:
+    """Return the mean time per frame, in microseconds, with the score changing every frame."""
+    start = time.perf_counter()
+    for score in range(frames):
+        draw(score)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    args = parser.parse_args()
+
+    screen = pyxel.Image(consts.W, consts.H)
+    pyxel.text, pyxel.blt = screen.text, screen.blt
+    for name, make_draw in (("pyxel.text", plain_text), ("strings", cached_strings), ("glyphs", cached_glyphs)):
+        draw = make_draw()
+        print(f"{name:>10}: {time_draw(draw, args.frames):8.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
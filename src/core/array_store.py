@@ -0,0 +1,150 @@
+"""
+An optional, NumPy-backed struct-of-arrays store for entity positions, velocities and bounds.
+
+When an EntityCollection is given an ArrayStore, every entity added to it keeps its rect in
+contiguous arrays, so that movement, culling and bounding-box tests run as a single
+vectorized operation per frame rather than a Python loop over entities.
+Entities remain usable as before: their rect is replaced with a RectView into the arrays.
+
+NumPy is not required by the game itself, and is only imported when a store is created.
+"""
+
+from typing import TYPE_CHECKING
+
+from src.entities.entity import Entity, Rect
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_CAPACITY = 256
+
+
+class RectView(Rect):
+    """A Rect whose values live in an ArrayStore slot."""
+
+    __slots__ = ("_store", "slot")
+
+    def __init__(self, store: "ArrayStore", slot: int):  # Values are stored in the arrays, not in dataclass fields
+        self._store = store
+        self.slot = slot
+
+    @property
+    def x(self) -> float:
+        return self._store.x[self.slot]
+
+    @x.setter
+    def x(self, value: float):
+        self._store.x[self.slot] = value
+
+    @property
+    def y(self) -> float:
+        return self._store.y[self.slot]
+
+    @y.setter
+    def y(self, value: float):
+        self._store.y[self.slot] = value
+
+    @property
+    def w(self) -> float:
+        return self._store.w[self.slot]
+
+    @w.setter
+    def w(self, value: float):
+        self._store.w[self.slot] = value
+
+    @property
+    def h(self) -> float:
+        return self._store.h[self.slot]
+
+    @h.setter
+    def h(self, value: float):
+        self._store.h[self.slot] = value
+
+
+class ArrayStore:
+    """
+    Stores x/y/w/h, velocities and tag bits of attached entities in NumPy arrays.
+
+    Slots of removed entities are reused, and the arrays grow when they run out of slots.
+    Velocities are captured when an entity is attached, and are then integrated by `integrate`,
+    instead of calling the entities' `update`, which attached entities therefore can't override.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        import numpy as np  # noqa: PLC0415 - numpy is an optional dependency
+
+        self._np = np
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.w = np.zeros(capacity)
+        self.h = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.tags = np.zeros(capacity, dtype=np.uint32)
+        self.handles: list[Entity | None] = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        np = self._np
+        capacity = len(self.handles)
+        for name in ("x", "y", "w", "h", "vx", "vy", "tags"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+        self.handles += [None] * capacity
+        self._free += range(2 * capacity - 1, capacity - 1, -1)
+
+    def attach(self, entity: "Entity", tag_bits: int):
+        """Move the entity's rect and velocity into the store."""
+        if isinstance(entity.rect, RectView):
+            self.tags[entity.rect.slot] |= tag_bits
+            return
+        if type(entity).update is not Entity.update:
+            msg = f"{type(entity).__name__} overrides update, which the store doesn't call"
+            raise TypeError(msg)
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        rect = entity.rect
+        self.x[slot], self.y[slot], self.w[slot], self.h[slot] = rect.x, rect.y, rect.w, rect.h
+        self.vx[slot], self.vy[slot] = entity.vx, entity.vy
+        self.tags[slot] = tag_bits
+        self.handles[slot] = entity
+        entity.rect = RectView(self, slot)
+
+    def detach(self, entity: "Entity"):
+        """Move the entity's rect back out of the store, and free its slot."""
+        view = entity.rect
+        if not isinstance(view, RectView) or view._store is not self:  # noqa: SLF001
+            return
+        slot = view.slot
+        entity.rect = Rect(float(view.x), float(view.y), float(view.w), float(view.h))
+        self.vx[slot] = self.vy[slot] = 0
+        self.tags[slot] = 0
+        self.handles[slot] = None
+        self._free.append(slot)
+
+    def has_tags(self, tag_bits: int) -> "np.ndarray":
+        """Return a mask of the slots that have any of the given tag bits."""
+        return (self.tags & tag_bits) != 0
+
+    def entities_where(self, mask: "np.ndarray") -> list["Entity"]:
+        """Return the entities in the masked slots, in slot order."""
+        handles = self.handles
+        return [handles[slot] for slot in self._np.flatnonzero(mask)]  # type: ignore[misc]
+
+    def integrate(self):
+        """Move every entity by its velocity."""
+        self.x += self.vx
+        self.y += self.vy
+
+    def overlapping(self, tag_bits: int, rect: Rect, dx: float = 0) -> list["Entity"]:
+        """Return the entities with any of the given tag bits whose rect overlaps `rect` moved by `dx`."""
+        x, y = self.x, self.y
+        mask = (
+            self.has_tags(tag_bits)
+            & (x <= rect.right + dx)
+            & (x + self.w >= rect.left + dx)
+            & (y <= rect.bottom)
+            & (y + self.h >= rect.top)
+        )
+        return self.entities_where(mask)
@@ -0,0 +1,124 @@
+"""
+Loads the game's resources from the package's resources directory, regardless of the working directory.
+
+Decoded images and fonts are cached, and loaded lazily on first use, so each asset is loaded once.
+Non-critical loads can be deferred until after the first frame with `defer`.
+The time spent in every load is recorded, for a startup-time breakdown.
+
+Loads can't be moved to a background thread: pyxel's images and fonts may only be used
+by the thread that created them.
+
+Image banks can also be read from a resource file without `pyxel.load`, which requires a window,
+for the headless simulation to bake collision masks from the sprite sheet.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import pyxel
+
+RESOURCES_DIR = (Path(__file__).parent / "../../resources").resolve()
+RESOURCE_FILE = "res.pyxres"
+
+
+class Assets:
+    """A cache of the resources in `resources_dir`, with the time each took to load."""
+
+    def __init__(self, resources_dir: Path = RESOURCES_DIR):
+        self.resources_dir = resources_dir
+        self.timings: dict[str, float] = {}  # Seconds spent on each load or startup stage, in order
+        self._cache: dict[str, Any] = {}
+        self._deferred: list[Callable[[], object]] = []
+
+    def path(self, name: str) -> Path:
+        """Resolve a resource by name, and handle missing files."""
+        path = self.resources_dir / name
+        if not path.exists():
+            msg = f"Resource not found at {path}"
+            raise FileNotFoundError(msg)
+        return path
+
+    @contextmanager
+    def timed(self, label: str) -> Iterator[None]:
+        """Record the time spent in the block under `label`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[label] = self.timings.get(label, 0) + time.perf_counter() - start
+
+    def _cached(self, key: str, load: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            with self.timed(key):
+                self._cache[key] = load()
+        return self._cache[key]
+
+    def image(self, name: str) -> pyxel.Image:
+        return self._cached(name, lambda: pyxel.Image.from_image(str(self.path(name))))
+
+    def font(self, name: str) -> pyxel.Font:
+        return self._cached(name, lambda: pyxel.Font(str(self.path(name))))
+
+    def font_height(self, name: str) -> int:
+        """The height of a BDF font's glyphs, from its bounding box, since pyxel's fonts don't expose it."""
+        return self._cached(f"{name} height", lambda: _bdf_height(self.path(name)))
+
+    def image_bank(self, name: str, bank: int) -> pyxel.Image:
+        """An image bank of a pyxel resource file, read without loading the file into pyxel's banks."""
+        return self._cached(f"{name} image bank {bank}", lambda: _read_image_bank(self.path(name), bank))
+
+    def load_resources(self, name: str, **exclude: bool):
+        """
+        Load a pyxel resource file into pyxel's images, tilemaps, sounds and musics.
+
+            exclude: `pyxel.load` flags, e.g. `exclude_musics=True`, to load parts of it separately.
+        """
+        excluded = sorted(key.removeprefix("exclude_") for key, value in exclude.items() if value)
+        label = f"{name} (without {', '.join(excluded)})" if excluded else name
+        with self.timed(label):
+            pyxel.load(str(self.path(name)), **exclude)
+
+    def defer(self, load: Callable[[], object]):
+        """Queue a load for `run_deferred`, for assets that aren't needed for the first frame."""
+        self._deferred.append(load)
+
+    def run_deferred(self):
+        while self._deferred:
+            self._deferred.pop(0)()
+
+    def report(self) -> str:
+        """A breakdown of the recorded timings, in milliseconds."""
+        width = max((len(label) for label in self.timings), default=0)
+        return "\n".join(f"{label:<{width}}  {seconds * 1000:8.2f} ms" for label, seconds in self.timings.items())
+
+
+def _read_image_bank(path: Path, bank: int) -> pyxel.Image:
+    import tomllib  # noqa: PLC0415 - only needed to read image banks headlessly
+    import zipfile  # noqa: PLC0415
+
+    with zipfile.ZipFile(path) as archive:
+        resource = tomllib.loads(archive.read("pyxel_resource.toml").decode())
+    data = resource["images"][bank]
+    rows: list[list[int]] = data["data"]
+    image = pyxel.Image(data["width"], data["height"])
+    # Trailing repeated pixels and rows are trimmed when saving, so repeat the last ones to fill the bank
+    for y in range(image.height):
+        row = rows[min(y, len(rows) - 1)]
+        row = row + [row[-1]] * (image.width - len(row))
+        image.set(0, y, ["".join(f"{color:x}" for color in row)])
+    return image
+
+
+def _bdf_height(path: Path) -> int:
+    with path.open() as file:
+        for line in file:
+            if line.startswith("FONTBOUNDINGBOX"):
+                return int(line.split()[2])
+    msg = f"No FONTBOUNDINGBOX in {path}"
+    raise ValueError(msg)
+
+
+assets = Assets()
@@ -1,41 +1,96 @@
-from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
 
 import pyxel
 
 from . import consts
+from .assets import assets
 from .consts import SCROLL_SPEED
 
+if TYPE_CHECKING:
+    from types import ModuleType
+
 BG_SCROLL_SPEED = SCROLL_SPEED // 3
 
 
-class Background:
+class Layer(NamedTuple):
     """
-    Handles drawing and scrolling the background and foreground(floor) images.
-    Background scrolls slower than the foreground for a parallax effect.
+    A horizontally repeating background layer.
+
+        image: The layer's image, by asset name.
+        y: The y the layer is drawn at.
+        parallax: How many pixels the camera scrolls for every pixel the layer scrolls.
+        period: The width after which the layer repeats, the image's width by default.
+            An image wider than the screen may repeat itself within its width, with a shorter period.
+        colkey: The layer's transparent color, or None for an opaque layer.
     """
 
-    def __init__(self):
-        self.bg_img: pyxel.Image = self.load_image("../../resources/background.png")
-        self.fg_img: pyxel.Image = self.load_image("../../resources/floor.png")
+    image: str
+    y: int
+    parallax: int = 1
+    period: int | None = None
+    colkey: int | None = None
+
 
-        self.bg_x: float = 0  # Background position
-        self.fg_x: float = 0  # Foreground position
-        self.fg_min_x: float = consts.W - self.fg_img.width  # Minimum scroll position
-        self.fg_y: float = consts.FLOOR_Y - 1  # y-position of the foreground floor
+# Drawn in order, back to front
+LAYERS = (
+    Layer("background.png", 0, parallax=SCROLL_SPEED // BG_SCROLL_SPEED),
+    Layer("floor.png", consts.FLOOR_Y - 1, period=64),  # The floor's pattern repeats every 64 pixels
+)
+
+
+class Background:
+    """
+    Handles drawing and scrolling the background layers, each scrolling slower the farther back it is.
+
+    Every layer is pre-composed once into a wrap-around strip, one period plus a screen wide,
+    so any scroll position is drawn with a single blit per layer.
+    While the game isn't scrolling, the layers are composed into a single cached image, drawn with a single blit.
+    """
+
+    def __init__(self, layers: tuple[Layer, ...] = LAYERS):
+        self.layers = layers
+        self.strips = [self._compose_strip(layer) for layer in layers]
+        self._cache = pyxel.Image(consts.W, consts.H)
+        self._cached_scroll_x: float | None = None  # Camera position the cache was composed for
+        self._drawn_scroll_x: float | None = None  # Camera position of the last draw
+        self.blits: int = 0  # Blits to the screen in the last draw
 
     @staticmethod
-    def load_image(path: str) -> pyxel.Image:
-        """Load an image and handle missing files."""
-        if not Path(path).exists():
-            msg = f"Image not found at {path}"
-            raise FileNotFoundError(msg)
-        return pyxel.Image.from_image(path)
-
-    def update(self):
-        self.fg_x = (self.fg_x - SCROLL_SPEED) % self.fg_min_x
-        self.bg_x = (self.bg_x - BG_SCROLL_SPEED) % (-self.bg_img.width)
-
-    def draw(self):
-        pyxel.blt(self.bg_x, 0, self.bg_img, 0, 0, self.bg_img.width, self.bg_img.height)
-        pyxel.blt(self.bg_x + self.bg_img.width, 0, self.bg_img, 0, 0, self.bg_img.width, self.bg_img.height)
-        pyxel.blt(self.fg_x, self.fg_y, self.fg_img, 0, 0, self.fg_img.width, self.fg_img.height)
+    def _compose_strip(layer: Layer) -> pyxel.Image:
+        """Repeat the layer's image into a strip that covers the screen at any offset within a period."""
+        image = assets.image(layer.image)
+        period = layer.period or image.width
+        strip = pyxel.Image(period + consts.W, image.height)
+        for x in range(0, strip.width, image.width):
+            strip.blt(x, 0, image, 0, 0, image.width, image.height)
+        return strip
+
+    def _offsets(self, scroll_x: float) -> list[int]:
+        """The x within each strip the screen starts at, for a scroll position."""
+        return [
+            int(scroll_x // layer.parallax) % (strip.width - consts.W)
+            for layer, strip in zip(self.layers, self.strips, strict=True)
+        ]
+
+    def draw(self, scroll_x: float):
+        """Draw the layers scrolled to a camera position."""
+        if scroll_x == self._cached_scroll_x:
+            pyxel.blt(0, 0, self._cache, 0, 0, consts.W, consts.H)
+            self.blits = 1
+            return
+
+        if scroll_x != self._drawn_scroll_x:
+            self._draw_layers(pyxel, scroll_x)
+            self.blits = len(self.layers)
+        else:
+            # The scrolling stopped, so compose the layers once, and reuse them until it resumes
+            self._draw_layers(self._cache, scroll_x)
+            self._cached_scroll_x = scroll_x
+            pyxel.blt(0, 0, self._cache, 0, 0, consts.W, consts.H)
+            self.blits = 1
+        self._drawn_scroll_x = scroll_x
+
+    def _draw_layers(self, target: "pyxel.Image | ModuleType", scroll_x: float):
+        """Draw the layers onto an image, or onto the screen if `target` is the pyxel module."""
+        for layer, strip, u in zip(self.layers, self.strips, self._offsets(scroll_x), strict=True):
+            target.blt(0, layer.y, strip, u, 0, consts.W, strip.height, layer.colkey)
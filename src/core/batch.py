@@ -0,0 +1,157 @@
+"""
+Simulates many headless sessions in parallel, across CPU cores, and reports score and difficulty statistics.
+
+Sessions are played by an input policy, and spawn settings can be overridden to evaluate tuning changes:
+
+    python -m src.core.batch --sessions 5000 --policy avoid --laser-size 3 5 --projectile-chance 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from . import consts
+from .entity_manager import HAZARD, SpawnSettings
+from .game import Game
+from .headless import DEFAULT_MAX_FRAMES, HeadlessRunner, InputPolicy, SessionResult
+from .rng import Rng
+
+CHUNK_SIZE = 50  # Sessions simulated per task
+
+
+class RandomPolicy:
+    """Toggles the input at random, with a chance of `toggle_chance` every frame."""
+
+    def __init__(self, seed: int, toggle_chance: float = 0.1):
+        self.rng = Rng(seed)
+        self.toggle_chance = toggle_chance
+        self.held = False
+
+    def __call__(self, _game: Game) -> bool:
+        if self.rng.uniform() < self.toggle_chance:
+            self.held = not self.held
+        return self.held
+
+
+class AvoidPolicy:
+    """
+    A simple AI that steers the player towards the closest gap between upcoming hazards.
+
+    Hazards within `lookahead` pixels ahead of the player block the vertical range they cover,
+    and the player flies up whenever its predicted position is below the center of the chosen gap.
+    """
+
+    LOOKAHEAD = 80
+    MARGIN = 4  # Extra room required around the player for a gap to be usable
+    PREDICTION_FRAMES = 4
+
+    def __init__(self, _seed: int = 0):
+        pass
+
+    def target_y(self, game: Game) -> float:
+        player = game.player.rect
+        # Hazards are in world space, and the player in screen space
+        left, right = player.left + game.camera.x, player.right + game.camera.x
+        blocked = sorted(
+            (hazard.rect.top - self.MARGIN, hazard.rect.bottom + self.MARGIN)
+            for hazard in game.entity_manager.entities.get(HAZARD)
+            if hazard.rect.left < right + self.LOOKAHEAD and hazard.rect.right > left
+        )
+
+        # Find the gaps between blocked ranges, and pick the one closest to the player
+        gaps = []
+        top = consts.CEILING_Y
+        for blocked_top, blocked_bottom in blocked:
+            if blocked_top - top >= player.h:
+                gaps.append((top + blocked_top) / 2)
+            top = max(top, blocked_bottom)
+        if consts.FLOOR_Y - top >= player.h:
+            gaps.append((top + consts.FLOOR_Y) / 2)
+
+        center = player.y + player.h / 2
+        return min(gaps, key=lambda gap: abs(gap - center), default=center)
+
+    def __call__(self, game: Game) -> bool:
+        player = game.player
+        predicted = player.rect.y + player.rect.h / 2 + player.vy * self.PREDICTION_FRAMES
+        return predicted > self.target_y(game)
+
+
+POLICIES: dict[str, type[RandomPolicy | AvoidPolicy]] = {"random": RandomPolicy, "avoid": AvoidPolicy}
+
+
+def simulate_sessions(
+    policy_name: str, seeds: list[int], max_frames: int, settings: SpawnSettings
+) -> list[SessionResult]:
+    """Play a session for every seed, each with a fresh policy."""
+    results = []
+    for seed in seeds:
+        policy: InputPolicy = POLICIES[policy_name](seed)
+        runner = HeadlessRunner(policy, Game(seed=seed, spawn_settings=settings, muted=True))
+        results.append(runner.run_session(max_frames))
+    return results
+
+
+def run_batch(  # noqa: PLR0913
+    sessions: int,
+    policy_name: str,
+    *,
+    settings: SpawnSettings | None = None,
+    seed: int = 0,
+    max_frames: int = DEFAULT_MAX_FRAMES,
+    workers: int | None = None,
+) -> list[SessionResult]:
+    """Simulate `sessions` sessions across `workers` processes (all cores by default)."""
+    seeds = Rng(seed).rndi_batch(0, 2**32 - 1, sessions)
+    chunks = [seeds[i : i + CHUNK_SIZE] for i in range(0, sessions, CHUNK_SIZE)]
+    settings = settings or SpawnSettings()
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(simulate_sessions, policy_name, chunk, max_frames, settings) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+
+def summarize(results: list[SessionResult]) -> dict:
+    def distribution(values: list[float]) -> dict[str, float]:
+        deciles = statistics.quantiles(values, n=10, method="inclusive") if len(values) > 1 else values * 9
+        return {
+            "mean": statistics.fmean(values),
+            "p10": deciles[0],
+            "p50": deciles[4],
+            "p90": deciles[8],
+            "max": max(values),
+        }
+
+    causes = Counter(result.cause or "survived" for result in results)
+    return {
+        "sessions": len(results),
+        "score": distribution([result.score for result in results]),
+        "survival_frames": distribution([result.frames for result in results]),
+        "cause_of_death": {cause: count / len(results) for cause, count in causes.most_common()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--policy", choices=POLICIES, default="avoid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=DEFAULT_MAX_FRAMES, help="frames per session, at most")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    defaults = SpawnSettings()
+    parser.add_argument("--laser-size", type=int, nargs=2, default=defaults.laser_size_bounds, metavar=("MIN", "MAX"))
+    parser.add_argument("--projectile-chance", type=float, default=defaults.projectile_spawn_chance)
+    parser.add_argument("--coins-chance", type=float, default=defaults.coins_spawn_chance)
+    args = parser.parse_args()
+
+    settings = SpawnSettings(tuple(args.laser_size), args.projectile_chance, args.coins_chance)
+    results = run_batch(
+        args.sessions, args.policy, settings=settings, seed=args.seed, max_frames=args.max_frames, workers=args.workers
+    )
+    print(json.dumps(summarize(results), indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+class Camera:
+    """
+    The horizontal scroll position of the screen, in world coordinates.
+
+    Scrolling entities keep fixed world positions, and only the camera moves, so scrolling costs
+    the same regardless of the number of entities. Entities are transformed into screen space
+    only when drawn and culled.
+    """
+
+    def __init__(self):
+        self.x: float = 0  # World x of the screen's left edge
+        self.previous_x: float = 0  # The camera's x before the current frame was simulated
+
+    def begin_frame(self):
+        """Remember the camera's position before a frame is simulated, for `interpolate`."""
+        self.previous_x = self.x
+
+    def scroll(self, dx: float):
+        self.x += dx
+
+    def interpolate(self, alpha: float) -> float:
+        """The camera's x a fraction `alpha` of the way from its previous position to its current one."""
+        return self.previous_x + (self.x - self.previous_x) * alpha
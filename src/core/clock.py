@@ -0,0 +1,14 @@
+class Clock:
+    """
+    Counts the frames simulated by a game session.
+
+    Game logic reads the frame count from here instead of `pyxel.frame_count`,
+    so a session can be stepped without a pyxel window.
+    """
+
+    def __init__(self):
+        self.frame_count: int = 0
+
+    def tick(self):
+        """Advance the clock by a single frame."""
+        self.frame_count += 1
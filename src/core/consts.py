@@ -5,6 +5,8 @@ CEILING_Y = 10
 TILE_SIZE = 16
 IMG_COLKEY = 2
 SCROLL_SPEED = 5
+FPS = 30  # Simulation steps per second
+DISPLAY_FPS = 60  # Frames drawn per second, interpolated between simulation steps
 
 POINTS_PER_FRAME = 0.5  # By how much is the player's is score updated every frame
 POINTS_PER_COIN = 100
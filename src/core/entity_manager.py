@@ -1,24 +1,35 @@
 from collections.abc import Generator, Iterable
-from typing import TYPE_CHECKING
-
-import pyxel
+from typing import TYPE_CHECKING, NamedTuple
 
 from src.entities.concrete import (
-    Scientist,
+    bullet_pool,
+    coin_pool,
     make_coins,
     make_laser,
     make_player_bullets,
     make_projectile,
+    make_scientist,
+    projectile_pool,
+    scientist_pool,
 )
+from src.entities.concrete.lasers import LASER_MAKERS, LASER_SIZE_BOUNDS, LaserMaker
 from src.entities.entity import Entity
 
 from . import consts
-from .sounds import sounds
+from .camera import Camera
+from .clock import Clock
+from .profiler import Profiler
+from .render_queue import RenderQueue
+from .rng import Rng
+from .sounds import Sounds
+from .sweep_and_prune import SweepAndPrune
 
 if TYPE_CHECKING:
     from entities.concrete.player import Player
     from entities.entity import Rect
 
+    from .array_store import ArrayStore
+
 
 SCROLLABLE = "scrollable"
 SCIENTIST = "scientist"
@@ -27,120 +38,273 @@ COIN = "coin"
 PLAYER_BULLET = "player_bullet"
 
 TAGS = (SCROLLABLE, SCIENTIST, HAZARD, COIN, PLAYER_BULLET)
+INDEXED_TAGS = (SCIENTIST, HAZARD, COIN)  # Tags with a sweep-and-prune index, for collision queries
+TAG_BITS = {tag: 1 << i for i, tag in enumerate(TAGS)}
+# The tags of every possible tag bitmask
+TAGS_OF_BITS = tuple(tuple(tag for tag in TAGS if bits & TAG_BITS[tag]) for bits in range(1 << len(TAGS)))
+
+
+def tag_bits(tags: Iterable[str]) -> int:
+    bits = 0
+    for tag in tags:
+        bits |= TAG_BITS[tag]
+    return bits
 
 
 class EntityCollection:
-    def __init__(self):
-        self.entities: set[Entity] = set()
-        self.groups: dict[str, set[Entity]] = {}
+    """
+    A set of entities, grouped by tags.
+
+    Entities are kept in insertion order, both in the collection and in each tag group,
+    so iterating over them (and the collision queries) is deterministic.
+
+    The collection stores each entity's tag bitmask, so removing an entity only touches its own groups.
+    Removals can be queued with `remove_later`, and applied together with `flush_removals`.
+
+    Indexed tags keep their entities sorted along x, updated as entities are added and removed.
+    Collision queries return their candidates by x, then by insertion order, with or without a store,
+    so the first hit, e.g. the scientist a bullet kills, doesn't depend on the code path.
+
+    If an ArrayStore is given, the entities' positions are kept in it while they are in the collection,
+    and the indexes are replaced by vectorized bounding-box tests against the store.
+    """
+
+    def __init__(self, store: "ArrayStore | None" = None):
+        self.store = store
+        self.entities: dict[Entity, int] = {}  # Tag bitmask of each entity, in insertion order
+        self.order: dict[Entity, int] = {}  # When each entity was added, to break ties between equal x
+        self._added = 0
+        self.groups: dict[str, dict[Entity, None]] = {}
         for tag in TAGS:
-            self.groups[tag] = set()
+            self.groups[tag] = {}
+        self.indexes: dict[str, SweepAndPrune] = {tag: SweepAndPrune() for tag in INDEXED_TAGS}
+        self.pending_removals: dict[Entity, None] = {}
 
     def __iter__(self):
         return iter(self.entities)
 
     def add(self, entity: Entity, tags: Iterable[str] = ()):
-        self.entities.add(entity)
-        for tag in tags:
-            self.groups[tag].add(entity)
+        self.add_batch((entity,), tags)
 
     def add_batch(self, entities: Iterable[Entity], tags: Iterable[str] = ()):
-        self.entities.update(entities)
-        for tag in tags:
-            self.groups[tag].update(entities)
+        bits = tag_bits(tags)
+        batch = dict.fromkeys(entities)
+        for entity in batch:
+            if entity not in self.entities:
+                self.order[entity] = self._added
+                self._added += 1
+            self.entities[entity] = self.entities.get(entity, 0) | bits
+        for tag in TAGS_OF_BITS[bits]:
+            group = self.groups[tag]
+            if self.store is None and (index := self.indexes.get(tag)) is not None:
+                for entity in batch:
+                    if entity not in group:
+                        index.insert(entity)
+            group.update(batch)
+        if self.store is not None:
+            for entity in batch:
+                self.store.attach(entity, bits)
 
     def remove(self, entity: Entity):
-        self.entities.discard(entity)
-        for tag_group in self.groups.values():
-            tag_group.discard(entity)
+        self.remove_batch((entity,))
 
     def remove_batch(self, entities: Iterable[Entity]):
-        self.entities.difference_update(entities)
-        for tag_group in self.groups.values():
-            tag_group.difference_update(entities)
-
-    def get(self, tag: str) -> set[Entity]:
+        """Remove the entities, and release pooled ones back into their pool."""
+        all_entities, groups, indexes, store = self.entities, self.groups, self.indexes, self.store
+        for entity in entities:
+            bits = all_entities.pop(entity, None)
+            if bits is None:
+                continue  # Not in the collection, or already removed
+            del self.order[entity]
+            for tag in TAGS_OF_BITS[bits]:
+                del groups[tag][entity]
+                if store is None and (index := indexes.get(tag)) is not None:
+                    index.remove(entity)
+            if store is not None:
+                store.detach(entity)
+            if entity.pool is not None:
+                entity.pool.release(entity)
+
+    def remove_later(self, entities: Iterable[Entity]):
+        """Queue the entities for removal on the next `flush_removals`."""
+        self.pending_removals.update(dict.fromkeys(entities))
+
+    def flush_removals(self):
+        if self.pending_removals:
+            self.remove_batch(self.pending_removals)
+            self.pending_removals.clear()
+
+    def get(self, tag: str) -> dict[Entity, None]:
+        """Return the entities with the given tag, as an ordered set."""
         return self.groups[tag]
 
+    def reindex(self):
+        """Re-sort the indexes. Should be called after entities have moved."""
+        if self.store is not None:
+            return
+        for index in self.indexes.values():
+            index.sort()
 
-class EntityManager:
-    PROJECTILE_SPAWN_CHANCE = 40
-    COINS_SPAWN_CHANCE = 30
+    def near(self, tag: str, rect: "Rect", dx: float = 0) -> list[Entity]:
+        """
+        Return the entities of an indexed tag that may collide with `rect` moved by `dx`,
+        sorted by x, then by insertion order.
 
-    def __init__(self):
-        self.entities = EntityCollection()
+        Relies on the last `reindex`.
+        """
+        if self.store is not None:
+            candidates = self.store.overlapping(TAG_BITS[tag], rect, dx)
+        else:
+            candidates = self.indexes[tag].query(rect, dx)
+        if len(candidates) > 1:
+            order = self.order
+            candidates.sort(key=lambda entity: (entity.rect.x, order[entity]))
+        return candidates
+
+
+class SpawnSettings(NamedTuple):
+    """How often and how large hazards and coins spawn. Every game has its own, so games can be tuned separately."""
+
+    laser_size_bounds: tuple[int, int] = LASER_SIZE_BOUNDS
+    projectile_spawn_chance: float = 40  # Percent chance of a projectile with every laser
+    coins_spawn_chance: float = 30  # Percent chance of coins with every laser
+    spawn_period: int = 40  # Frames between spawns of lasers, projectiles and coins
+    laser_makers: tuple[LaserMaker, ...] = LASER_MAKERS  # The kinds of lasers spawned
+
+
+class EntityManager:
+    """
+    Spawns, moves, collides and removes the game's entities.
+
+    Scrollable entities live in world space, and scroll by moving the camera.
+    The player and its bullets live in screen space.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        clock: Clock | None = None,
+        rng: Rng | None = None,
+        store: "ArrayStore | None" = None,
+        profiler: Profiler | None = None,
+        camera: Camera | None = None,
+        spawn_settings: SpawnSettings | None = None,
+        pixel_masks: bool = False,
+        sounds: Sounds | None = None,
+    ):
+        self.clock = clock or Clock()
+        self.camera = camera or Camera()
+        self.rng = rng or Rng()
+        self.profiler = profiler or Profiler()
+        self.spawn_settings = spawn_settings or SpawnSettings()
+        self.pixel_masks = pixel_masks  # Whether diagonal lasers collide by their pixels
+        self.sounds = sounds or Sounds()
+        self.entities = EntityCollection(store)
+        self.render_queue = RenderQueue()
+        # Pools are owned by the manager, so recycled entities never cross between sessions
+        self.coin_pool = coin_pool()
+        self.bullet_pool = bullet_pool()
+        self.projectile_pool = projectile_pool()
+        self.scientist_pool = scientist_pool()
         self.generator = self._entity_generator()
         self.dead_scientists: int = 0
+        self.collided_hazard: Entity | None = None  # The hazard that ended the game
 
-    def _entity_generator(self) -> Generator[tuple[set[Entity], tuple[str, ...]]]:
+    def _entity_generator(self) -> Generator[tuple[list[Entity], tuple[str, ...]]]:
+        settings = self.spawn_settings
         while True:
-            yield (make_laser(), (SCROLLABLE, HAZARD))
-            if pyxel.rndf(1, 100) < self.PROJECTILE_SPAWN_CHANCE:
-                yield ({make_projectile()}, (SCROLLABLE, HAZARD))
-            if pyxel.rndf(1, 100) < self.COINS_SPAWN_CHANCE:
-                yield (make_coins(), (SCROLLABLE, COIN))
+            rng = self.rng
+            lasers = make_laser(
+                rng, size_bounds=settings.laser_size_bounds, pixel_masks=self.pixel_masks, makers=settings.laser_makers
+            )
+            yield (lasers, (SCROLLABLE, HAZARD))
+            projectile_roll, coins_roll = rng.rndf_batch(1, 100, 2)
+            if projectile_roll < settings.projectile_spawn_chance:
+                yield ([make_projectile(rng, self.projectile_pool)], (SCROLLABLE, HAZARD))
+            if coins_roll < settings.coins_spawn_chance:
+                yield (make_coins(rng, self.coin_pool), (SCROLLABLE, COIN))
+
+    def _add_scrollables(self, entities: list[Entity], tags: tuple[str, ...]):
+        """Adds entities spawned in screen space, moving them into world space."""
+        for entity in entities:
+            entity.rect.x += self.camera.x
+        self.entities.add_batch(entities, tags)
 
     def _generate_entities(self):
-        if pyxel.frame_count % 40 != 0:
+        if self.clock.frame_count % self.spawn_settings.spawn_period != 0:
             return
-        self.entities.add_batch(*next(self.generator))
+        self._add_scrollables(*next(self.generator))
 
     def _generate_scientists(self):
-        if pyxel.frame_count % 5 != 0 or pyxel.rndi(1, 10) != 1:
+        if self.clock.frame_count % 5 != 0 or self.rng.rndi(1, 10) != 1:
             return
-        scientist = Scientist(direction=-1) if pyxel.rndi(1, 5) == 1 else Scientist()
-        self.entities.add(scientist, (SCROLLABLE, SCIENTIST))
+        pool = self.scientist_pool
+        scientist = make_scientist(pool, direction=-1) if self.rng.rndi(1, 5) == 1 else make_scientist(pool)
+        self._add_scrollables([scientist], (SCROLLABLE, SCIENTIST))
 
     def _remove_entities(self):
-        to_remove = {e for e in self.entities.get(SCROLLABLE) if e.rect.right < 0} | {
-            b for b in self.entities.get(PLAYER_BULLET) if b.rect.top > consts.FLOOR_Y
-        }
-        self.entities.remove_batch(to_remove)
+        """Queues the removal of entities that left the screen."""
+        if (store := self.entities.store) is not None:
+            offscreen = store.has_tags(TAG_BITS[SCROLLABLE]) & (store.x + store.w < self.camera.x)
+            fallen = store.has_tags(TAG_BITS[PLAYER_BULLET]) & (store.y > consts.FLOOR_Y)
+            self.entities.remove_later(store.entities_where(offscreen | fallen))
+            return
+        left_edge = self.camera.x
+        self.entities.remove_later(e for e in self.entities.get(SCROLLABLE) if e.rect.right < left_edge)
+        self.entities.remove_later(b for b in self.entities.get(PLAYER_BULLET) if b.rect.top > consts.FLOOR_Y)
 
     def _move_scrollables(self):
-        for entity in self.entities.get(SCROLLABLE):
-            entity.move(-consts.SCROLL_SPEED, 0)
+        self.camera.scroll(consts.SCROLL_SPEED)
 
     def _handle_scientist_collisions(self):
         """Handles player bullet collisions with scientists."""
-        collided_scientists: set[Entity] = set()
-        collided_bullets: set[Entity] = set()
+        collided_scientists: dict[Entity, None] = {}
+        collided_bullets: dict[Entity, None] = {}
 
+        camera_x = self.camera.x
         for bullet in self.entities.get(PLAYER_BULLET):
-            for scientist in self.entities.get(SCIENTIST):
-                if bullet.collides(scientist):
-                    collided_bullets.add(bullet)
-                    collided_scientists.add(scientist)
+            for scientist in self.entities.near(SCIENTIST, bullet.rect, camera_x):
+                if bullet.collides(scientist, -camera_x):
+                    collided_bullets[bullet] = None
+                    collided_scientists[scientist] = None
                     break
 
-        self.entities.remove_batch(collided_bullets)
-        self.entities.remove_batch(collided_scientists)
+        self.entities.remove_later(collided_bullets)
+        self.entities.remove_later(collided_scientists)
         self.dead_scientists += len(collided_scientists)
         if collided_scientists:
-            sounds.hit_scientist()
+            self.sounds.hit_scientist()
 
     def _handle_coin_collisions(self, player: "Player"):
         """Handles player collisions with coins."""
-        collided_coins = {coin for coin in self.entities.get(COIN) if coin.collides(player)}
-        self.entities.remove_batch(collided_coins)
+        camera_x = self.camera.x
+        collided_coins = [
+            coin for coin in self.entities.near(COIN, player.rect, camera_x) if coin.collides(player, camera_x)
+        ]
+        self.entities.remove_later(collided_coins)
         player.coins += len(collided_coins)
         if collided_coins:
-            sounds.catch_coin()
+            self.sounds.catch_coin()
 
     def _handle_hazard_collisions(self, player: "Player"):
         """Handles player collisions with hazards."""
-        colliding = next((h for h in self.entities.get(HAZARD) if player.collides(h)), None)
+        camera_x = self.camera.x
+        colliding = next(
+            (h for h in self.entities.near(HAZARD, player.rect, camera_x) if player.collides(h, -camera_x)), None
+        )
         if colliding:
+            self.collided_hazard = colliding
             player.game_over()
 
     def _handle_collisions(self, player: "Player"):
         """Handles all entity collisions in separate steps."""
+        self.entities.reindex()
         self._handle_scientist_collisions()
         self._handle_coin_collisions(player)
         self._handle_hazard_collisions(player)
 
     def make_player_bullets(self, player_rect: "Rect"):
-        new_bullets = make_player_bullets(player_rect)
+        new_bullets = make_player_bullets(player_rect, self.rng, self.bullet_pool)
         self.entities.add_batch(new_bullets, (PLAYER_BULLET,))
 
     def collect_dead_scientists(self):
@@ -155,17 +319,43 @@ class EntityManager:
         Should be called every frame when the screen is scrolling.
         Generates new entities, moves existing ones, and handles collisions.
         """
-        self._generate_entities()
-        self._generate_scientists()
-        self._move_scrollables()
-        self._handle_collisions(player)
+        profiler = self.profiler
+        with profiler.section("update_scrollables.generate"):
+            self._generate_entities()
+            self._generate_scientists()
+        with profiler.section("update_scrollables.move"):
+            self._move_scrollables()
+        with profiler.section("update_scrollables.collide"):
+            self._handle_collisions(player)
+
+    def entity_counts(self) -> dict[str, int]:
+        """Return the number of live entities, in total and per tag."""
+        return {"total": len(self.entities.entities)} | {tag: len(group) for tag, group in self.entities.groups.items()}
+
+    def end_frame(self):
+        """Removes the entities that left the screen or collided this frame. Should be called once per frame."""
+        self._remove_entities()
+        self.entities.flush_removals()
 
     def update_static(self):
         """Updates everything that should be updated when the screen is not scrolling"""
-        self._remove_entities()
+        if (store := self.entities.store) is not None:
+            store.integrate()
+            return
         for entity in self.entities:
             entity.update()
 
-    def draw(self):
+    def draw(self, alpha: float = 1):
+        """
+        Draw the entities a fraction `alpha` of the way from their previous frame's positions to their current ones.
+
+        Entities move by their velocity every frame, and scrollables also by the camera's scroll,
+        so their previous positions are extrapolated back instead of stored.
+        """
+        scrollables = self.entities.get(SCROLLABLE)
+        camera_x = self.camera.interpolate(alpha)
+        back = alpha - 1
         for entity in self.entities:
-            entity.draw()
+            dx = -camera_x if entity in scrollables else 0
+            entity.submit(self.render_queue, dx + entity.vx * back, entity.vy * back)
+        self.render_queue.flush()
@@ -1,12 +1,16 @@
-from dataclasses import asdict, dataclass
-from itertools import cycle
+from dataclasses import dataclass, field
 
 import pyxel
 
+from .clock import Clock
 from .consts import IMG_COLKEY
 
+# The clock all animations are timed by. Animations are only drawn, so they don't need a session's clock;
+# the app sets it to the game's frame count, so animations run at the simulation's rate, not the display's.
+ANIMATION_CLOCK = Clock()
 
-@dataclass
+
+@dataclass(slots=True)
 class Frame:
     img: int | pyxel.Image
     u: float
@@ -16,6 +20,11 @@ class Frame:
     colkey: int | None = IMG_COLKEY
     rotate: float | None = None
     scale: float | None = None
+    # Positional arguments for `pyxel.blt`, after x and y
+    blt_args: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.blt_args = (self.img, self.u, self.v, self.w, self.h, self.colkey, self.rotate, self.scale)
 
     @staticmethod
     def empty():
@@ -24,20 +33,33 @@ class Frame:
 
 
 class FrameManager:
+    """
+    An animation, cycling through a sequence of frames.
+
+    The current frame is computed from the animation clock and the animation's phase (the frame count
+    it started at), so animations never need updating, and may be shared by any number of entities.
+    """
+
+    __slots__ = ("frame_delay", "phase", "sequence")
+
     def __init__(self, frames: tuple["Frame", ...], frame_delay: int = 2):
-        self.frames = cycle(frames)
-        self.frame: Frame = next(self.frames)
+        self.sequence = frames
         self.frame_delay: int = frame_delay
-        self.elapsed_frames: int = 0
+        self.phase: int = 0
+
+    def reset(self):
+        """Restart the animation from the first frame."""
+        self.phase = ANIMATION_CLOCK.frame_count
 
-    def update(self):
-        self.elapsed_frames += 1
-        if self.elapsed_frames >= self.frame_delay:
-            self.frame = next(self.frames)
-            self.elapsed_frames = self.elapsed_frames - self.frame_delay
+    @property
+    def frame(self) -> Frame:
+        sequence = self.sequence
+        if len(sequence) == 1:
+            return sequence[0]
+        return sequence[(ANIMATION_CLOCK.frame_count - self.phase) // self.frame_delay % len(sequence)]
 
     def draw(self, x: float, y: float):
-        pyxel.blt(x, y, **asdict(self.frame))
+        pyxel.blt(x, y, *self.frame.blt_args)
 
     @staticmethod
     def empty() -> "FrameManager":
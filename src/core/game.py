@@ -0,0 +1,141 @@
+from enum import Enum
+
+from src.entities.concrete.player import Player
+
+from . import consts
+from .array_store import ArrayStore
+from .camera import Camera
+from .clock import Clock
+from .entity_manager import EntityManager, SpawnSettings
+from .profiler import Profiler
+from .rng import Rng
+from .sounds import Sounds
+
+
+class GameState(Enum):
+    START = 1
+    PLAYER_ENTERING = 2
+    PLAYING = 3
+    GAME_OVER = 4
+
+
+class Game:
+    """
+    The game's state machine and simulation, without any window, input polling or drawing.
+
+    Input is passed in to `update` every frame, which lets the same game logic
+    be driven either by the pyxel app or by a headless runner.
+
+    Every session draws its random numbers from its own seeded stream. The session seeds
+    are in turn drawn from a stream seeded by `seed`, so a whole run of sessions is reproducible.
+
+    A game keeps all of its state, down to its frame count, settings and sounds, to itself, and doesn't use
+    pyxel's window, images or global frame count, so any number of games can be simulated in one process.
+    Its only use of pyxel is playing sounds, unless it's `muted`, as headless runners make it.
+
+    With `array_store`, entities are moved by integrating their velocities in the store,
+    without calling their `update`, so entities kept in it must not override `update`.
+    With `pixel_masks`, diagonal lasers collide by their pixels instead of by their hitboxes,
+    which changes the results, so replays record it.
+    With `spawn_settings`, hazards and coins spawn with other sizes and chances than the defaults.
+    Replays don't record these, so only games with the default spawn settings can be recorded.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        seed: int | None = None,
+        *,
+        array_store: bool = False,
+        pixel_masks: bool = False,
+        spawn_settings: SpawnSettings | None = None,
+        muted: bool = False,
+        profiler: Profiler | None = None,
+    ):
+        self.clock = Clock()
+        self.profiler = profiler or Profiler()
+        self.array_store = array_store  # Whether entities are kept in a NumPy ArrayStore
+        self.pixel_masks = pixel_masks
+        self.spawn_settings = spawn_settings or SpawnSettings()
+        self.sounds = Sounds(muted=muted)
+        self._session_seeds = Rng(seed)
+        self.high_score: float = 0
+        self.reset()
+
+    @property
+    def seed(self) -> int:
+        """The seed all sessions are derived from."""
+        return self._session_seeds.seed
+
+    def update(self, *, action_pressed: bool, action_held: bool):
+        """
+        Advance the game by a single frame.
+
+            action_pressed: Whether the action input was pressed this frame.
+            action_held: Whether the action input is currently held.
+        """
+        self.camera.begin_frame()
+        with self.profiler.section("player.update"):
+            self.player.update()
+        with self.profiler.section("entity_manager.update_static"):
+            self.entity_manager.update_static()
+
+        match self.state:
+            case GameState.START:
+                if action_pressed:
+                    self.sounds.transition()
+                    self.player.start()
+                    self.state = GameState.PLAYER_ENTERING
+
+            case GameState.PLAYER_ENTERING:
+                if self.player.has_finished_entering():
+                    self.state = GameState.PLAYING
+
+            case GameState.PLAYING:
+                self.update_playing(action_held=action_held)
+
+            case GameState.GAME_OVER:
+                if self.score > self.high_score:
+                    self.new_high_score = True
+                    self.high_score = self.score
+
+                if action_pressed:
+                    self.sounds.transition()
+                    self.reset()
+
+        self.entity_manager.end_frame()
+        self.clock.tick()
+        self.profiler.end_step()
+
+    def update_playing(self, *, action_held: bool):
+        if action_held:
+            self.player.on_key_press()
+
+        self.update_score()
+        self.entity_manager.update_scrollables(self.player)
+
+        if self.player.is_game_over():
+            self.state = GameState.GAME_OVER
+
+    def update_score(self):
+        self.score += consts.POINTS_PER_FRAME
+        self.score += self.player.collect_coins() * consts.POINTS_PER_COIN
+        self.score += self.entity_manager.collect_dead_scientists() * consts.POINTS_PER_SCIENTIST
+
+    def reset(self, seed: int | None = None):
+        """Start a new session, seeded by `seed` or by the next session seed."""
+        self.rng = Rng(self._session_seeds.spawn_seed() if seed is None else seed)
+        self.camera = Camera()  # Every session scrolls from the origin, so world coordinates stay small
+        self.entity_manager = EntityManager(
+            clock=self.clock,
+            rng=self.rng,
+            store=ArrayStore() if self.array_store else None,
+            profiler=self.profiler,
+            camera=self.camera,
+            spawn_settings=self.spawn_settings,
+            pixel_masks=self.pixel_masks,
+            sounds=self.sounds,
+        )
+        self.player = Player(self.entity_manager)
+        self.state: GameState = GameState.START
+        self.score: float = 0
+        self.new_high_score = False
@@ -0,0 +1,102 @@
+"""
+Runs the game logic headlessly, at full CPU speed and without a window, rendering or audio.
+
+Used for simulating large numbers of frames, e.g. for balancing and regression checks:
+
+    runner = HeadlessRunner(pulse(period=20, hold_frames=12))
+    result = runner.run_session()
+"""
+
+from collections.abc import Callable, Generator
+from typing import NamedTuple
+
+from .game import Game, GameState
+
+# Decides whether the action input is held on the current frame
+InputPolicy = Callable[[Game], bool]
+
+DEFAULT_MAX_FRAMES = 100_000
+
+
+def idle(_game: Game) -> bool:
+    """A policy that never touches the input."""
+    return False
+
+
+def pulse(period: int, hold_frames: int) -> InputPolicy:
+    """Return a policy that holds the input for `hold_frames` out of every `period` frames."""
+
+    def policy(game: Game) -> bool:
+        return game.clock.frame_count % period < hold_frames
+
+    return policy
+
+
+class SessionResult(NamedTuple):
+    score: float
+    frames: int  # Frames spent in the PLAYING state
+    cause: str | None = None  # Kind of the hazard that ended the session, None if it didn't end
+
+
+class HeadlessRunner:
+    """
+    Steps a Game with input supplied by a policy instead of the keyboard and mouse.
+
+    Presses are derived from the policy's held state, so a press is registered
+    on the first frame the input is held.
+    """
+
+    def __init__(self, policy: InputPolicy = idle, game: Game | None = None):
+        self.game = game or Game()
+        self.game.sounds.muted = True  # Only this game's, since there's no audio without a window
+        self.policy = policy
+        self._was_held = False
+
+    def step(self):
+        held = self.policy(self.game)
+        self.game.update(action_pressed=held and not self._was_held, action_held=held)
+        self._was_held = held
+        if self.game.profiler.enabled:
+            self.game.profiler.end_frame(self.game.entity_manager.entity_counts())
+
+    def run(self, frames: int):
+        for _ in range(frames):
+            self.step()
+
+    def run_session(self, max_frames: int = DEFAULT_MAX_FRAMES) -> SessionResult:
+        """
+        Play a single session from the start screen until game over, or until `max_frames` frames were played.
+
+        The session is started automatically, and the game is reset back to the start screen afterwards.
+        """
+        session = self.play_session(max_frames)
+        while True:
+            try:
+                next(session)
+            except StopIteration as stop:
+                return stop.value
+
+    def play_session(self, max_frames: int = DEFAULT_MAX_FRAMES) -> Generator[None, None, SessionResult]:
+        """Like `run_session`, but yields after every frame, so the caller can interleave other work."""
+        game = self.game
+        if game.state != GameState.START:
+            game.reset()
+        game.update(action_pressed=True, action_held=True)
+        self._was_held = True
+        yield
+
+        while game.state == GameState.PLAYER_ENTERING:
+            self.step()
+            yield
+
+        frames = 0
+        while game.state == GameState.PLAYING and frames < max_frames:
+            self.step()
+            frames += 1
+            yield
+
+        hazard = game.entity_manager.collided_hazard
+        cause = hazard.kind if hazard and game.state == GameState.GAME_OVER else None
+        result = SessionResult(game.score, frames, cause)
+        game.reset()
+        return result
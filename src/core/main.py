@@ -1,84 +1,115 @@
+import atexit
+import math
+import os
+import sys
+import time
 from collections.abc import Callable
-from enum import Enum
+from pathlib import Path
 
 import pyxel
 
-from src.entities.concrete.player import Player
+from src.entities.concrete.lasers import MASKS_ENV_VAR, bake_collision_masks
 from src.entities.entity import Rect
 
 from . import consts
+from .assets import RESOURCE_FILE, assets
 from .background import Background
-from .entity_manager import EntityManager
-from .sounds import sounds
+from .frame_manager import ANIMATION_CLOCK
+from .game import Game, GameState
+from .profiler import Profiler
+from .replay import Recorder, Replay, replay_inputs
+from .text_cache import text_width
+from .timestep import MAX_STEPS_PER_FRAME, FixedTimestep
 
-
-class GameState(Enum):
-    START = 1
-    PLAYER_ENTERING = 2
-    PLAYING = 3
-    GAME_OVER = 4
+SMALL_FONT = "spleen-5x8.bdf"
+BIG_FONT = "spleen-8x16.bdf"
 
 
 class App:
-    def __init__(self):
-        pyxel.init(consts.W, consts.H)
-        pyxel.title("Rocket Flight")
-        pyxel.load("../../resources/res.pyxres")
-
-        self.small_font = pyxel.Font("../../resources/spleen-5x8.bdf")
-        self.big_font = pyxel.Font("../../resources/spleen-8x16.bdf")
-        self.music_button = MusicButton(110, 1, self.small_font)
-
-        self.background = Background()
-        self.high_score = 0
-        self.reset()
-
-        pyxel.run(self.update, self.draw)
-
-    def update(self):
-        self.music_button.update()
+    """
+    The pyxel app: polls input, runs the game and draws it.
 
-        self.player.update()
-        self.entity_manager.update_static()
+        replay: A replay to play back instead of polling input.
+        speed: Playback speed, relative to the normal frame rate.
+        record_path: Where to save a replay of this run, on exit, relative to the directory the game was started from.
 
-        match self.state:
-            case GameState.START:
-                if self.action_input_pressed():
-                    sounds.transition()
-                    self.player.start()
-                    self.state = GameState.PLAYER_ENTERING
+    The game is simulated at a fixed `consts.FPS` steps per second, scaled by `speed`, and drawn
+    at `consts.DISPLAY_FPS`, interpolating positions between the last two steps.
+    Input is polled every drawn frame, and a press is kept until a step consumes it.
 
-            case GameState.PLAYER_ENTERING:
-                if self.player.has_finished_entering():
-                    self.state = GameState.PLAYING
+    Only the assets needed for the first frame are loaded before it. The title screen uses both fonts,
+    so only the music is deferred, until after the first frame. The startup-time breakdown is printed when profiling.
+    """
 
-            case GameState.PLAYING:
-                self.update_playing()
+    def __init__(self, *, replay: Replay | None = None, speed: float = 1, record_path: Path | None = None):
+        self.start_time = time.perf_counter()
+        # Read before pyxel.init, which changes the working directory that relative paths resolve against
+        self.profiler = Profiler.from_env()
+        record_path = record_path.resolve() if record_path else None
+
+        with assets.timed("pyxel.init"):
+            pyxel.init(consts.W, consts.H, fps=consts.DISPLAY_FPS)
+            pyxel.title("Rocket Flight")
+        assets.load_resources(RESOURCE_FILE, exclude_musics=True)
+        assets.defer(self.load_music)
+
+        assets.font(SMALL_FONT)
+        assets.font(BIG_FONT)
+        self.music_button = MusicButton(110, 1)
+
+        if self.profiler.csv_path is not None:
+            atexit.register(self.profiler.export_csv, self.profiler.csv_path)
+        pixel_masks = replay.pixel_masks if replay else os.environ.get(MASKS_ENV_VAR) == "1"
+        if pixel_masks:
+            with assets.timed("collision masks"):
+                bake_collision_masks()
+        self.game = Game(seed=replay.seed if replay else None, pixel_masks=pixel_masks, profiler=self.profiler)
+        self.background = Background()
+        tick_rate = consts.FPS * speed
+        # Faster playback runs several steps every frame, so allow as many more to catch up
+        max_steps = MAX_STEPS_PER_FRAME * max(1, math.ceil(tick_rate / consts.DISPLAY_FPS))
+        self.timestep = FixedTimestep(tick_rate, max_steps)
+        self.action_pressed = False  # Whether the action input was pressed since the last step
 
-            case GameState.GAME_OVER:
-                if self.score > self.high_score:
-                    self.new_high_score = True
-                    self.high_score = self.score
+        self.replay_inputs = replay_inputs(replay) if replay else None
+        self.recorder = Recorder(self.game) if record_path else None
+        if self.recorder:
+            atexit.register(self.recorder.replay.save, record_path)
 
-                if self.action_input_pressed():
-                    sounds.transition()
-                    self.reset()
+        pyxel.run(self.update, self.draw)
 
-    def update_playing(self):
-        if self.action_input_held():
-            self.player.on_key_press()
+    def load_music(self):
+        assets.load_resources(RESOURCE_FILE, exclude_images=True, exclude_tilemaps=True, exclude_sounds=True)
+        self.music_button.start()
 
-        self.update_score()
-        self.background.update()
-        self.entity_manager.update_scrollables(self.player)
+    def update(self):
+        if pyxel.frame_count == 1:  # The first frame was just presented
+            assets.timings["first frame"] = time.perf_counter() - self.start_time
+            if self.profiler.enabled:
+                print(assets.report(), file=sys.stderr)  # noqa: T201
+        if pyxel.frame_count > 0:
+            assets.run_deferred()
 
-        if self.player.is_game_over():
-            self.state = GameState.GAME_OVER
+        self.music_button.update()
+        self.profiler.update()
+
+        self.action_pressed |= self.action_input_pressed()
+        steps = self.timestep.steps()
+        for _ in range(steps):
+            self.step()
+        self.profiler.count("timestep.steps", steps)
+
+    def step(self):
+        """Advance the game by a single simulation step."""
+        ANIMATION_CLOCK.frame_count = self.game.clock.frame_count
+        if self.replay_inputs is not None:
+            pressed, held = next(self.replay_inputs, (False, False))
+        else:
+            pressed, held = self.action_pressed, self.action_input_held()
+            self.action_pressed = False
 
-    def update_score(self):
-        self.score += consts.POINTS_PER_FRAME
-        self.score += self.player.collect_coins() * consts.POINTS_PER_COIN
-        self.score += self.entity_manager.collect_dead_scientists() * consts.POINTS_PER_SCIENTIST
+        update = self.recorder.update if self.recorder else self.game.update
+        update(action_pressed=pressed, action_held=held)
 
     def _is_action_input(self, btn_func: Callable[[int], bool]):
         return btn_func(pyxel.KEY_SPACE) or (pyxel.mouse_y >= consts.CEILING_Y and btn_func(pyxel.MOUSE_BUTTON_LEFT))
@@ -89,40 +120,45 @@ class App:
     def action_input_held(self):
         return self._is_action_input(pyxel.btn)
 
-    def reset(self):
-        self.entity_manager = EntityManager()
-        self.player = Player(self.entity_manager)
-        self.state: GameState = GameState.START
-        self.score: float = 0
-        self.new_high_score = False
-
     def draw(self):
-        self.background.draw()
+        game = self.game
+        alpha = self.timestep.alpha
+        with self.profiler.section("background.draw"):
+            self.background.draw(game.camera.interpolate(alpha))
+        self.profiler.count("background.blits", self.background.blits)
         self.music_button.draw()
-        self.entity_manager.draw()
-        self.player.draw()
+        with self.profiler.section("entity_manager.draw"):
+            game.entity_manager.draw(alpha)
+        render_queue = game.entity_manager.render_queue
+        self.profiler.count("entities.blits", render_queue.blits)
+        self.profiler.count("entities.culled", render_queue.culled)
+        game.player.draw(*game.player.interpolation_offset(alpha))
 
-        score_text = f"Score: {int(self.score)}"
         # Display score at top left, except in game over state
         # where the score is at the screen's center
-        self.draw_text(10, 1, score_text, self.small_font)
-        self.draw_text(240, 1, f"Best: {int(self.high_score)}", self.small_font)
+        score_text = f"Score: {int(game.score)}"
+        self.draw_text(10, 1, score_text, SMALL_FONT)
+        self.draw_text(240, 1, f"Best: {int(game.high_score)}", SMALL_FONT)
 
         # Display specific messages based on game state
-        if self.state == GameState.START:
-            self.draw_centered_text("Rocket Flight", 80, self.big_font)
-            self.draw_centered_text("Press <space> or click to start", 100, self.small_font)
-        elif self.state == GameState.GAME_OVER:
-            self.draw_centered_text("Game Over!", 85, self.big_font)
-            self.draw_centered_text(score_text, 100, self.small_font)
-            if self.new_high_score:
-                self.draw_centered_text("New high score!!!", 115, self.small_font)
-
-    def draw_text(self, x: int, y: int, text: str, font: pyxel.Font):
-        pyxel.text(x, y, text, 0, font)
-
-    def draw_centered_text(self, text: str, y: int, font: pyxel.Font):
-        x = consts.W / 2 - font.text_width(text) / 2
+        if game.state == GameState.START:
+            self.draw_centered_text("Rocket Flight", 80, BIG_FONT)
+            self.draw_centered_text("Press <space> or click to start", 100, SMALL_FONT)
+        elif game.state == GameState.GAME_OVER:
+            self.draw_centered_text("Game Over!", 85, BIG_FONT)
+            self.draw_centered_text(score_text, 100, SMALL_FONT)
+            if game.new_high_score:
+                self.draw_centered_text("New high score!!!", 115, SMALL_FONT)
+
+        if self.profiler.enabled:
+            self.profiler.draw()
+            self.profiler.end_frame(game.entity_manager.entity_counts())
+
+    def draw_text(self, x: int, y: int, text: str, font: str):
+        pyxel.text(x, y, text, 0, assets.font(font))
+
+    def draw_centered_text(self, text: str, y: int, font: str):
+        x = consts.W / 2 - text_width(font, text) / 2
         self.draw_text(int(x), y, text, font)
 
 
@@ -135,16 +171,14 @@ class MusicButton:
     ON_TEXT = "[ON]"
     OFF_TEXT = "[OFF]"
 
-    def __init__(self, x: float, y: float, font: pyxel.Font):
+    def __init__(self, x: float, y: float):
         self.is_music_playing = False
-        self._toggle_music()
 
-        self.font = font
-        self.rect = Rect(x, y, font.text_width(self._get_text()), 8)
+        self.texts = {True: f"{self.ON_TEXT} {self.MAIN_TEXT}", False: f"{self.OFF_TEXT} {self.MAIN_TEXT}"}
+        self.rect = Rect(x, y, text_width(SMALL_FONT, self.texts[True]), 8)
 
     def _get_text(self):
-        state_text = self.ON_TEXT if self.is_music_playing else self.OFF_TEXT
-        return f"{state_text} {self.MAIN_TEXT}"
+        return self.texts[self.is_music_playing]
 
     def _toggle_music(self):
         if self.is_music_playing:
@@ -154,6 +188,11 @@ class MusicButton:
             pyxel.playm(0, loop=True)
         self.is_music_playing = not self.is_music_playing
 
+    def start(self):
+        """Start playing the music, once it's loaded."""
+        if not self.is_music_playing:
+            self._toggle_music()
+
     def _in_bounds(self):
         return self.rect.right >= pyxel.mouse_x >= self.rect.left and self.rect.bottom >= pyxel.mouse_y >= self.rect.top
 
@@ -162,4 +201,4 @@ class MusicButton:
             self._toggle_music()
 
     def draw(self):
-        pyxel.text(self.rect.x, self.rect.y, self._get_text(), 0, self.font)
+        pyxel.text(self.rect.x, self.rect.y, self._get_text(), 0, assets.font(SMALL_FONT))
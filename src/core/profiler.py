@@ -0,0 +1,177 @@
+"""
+Per-subsystem frame-time instrumentation, with an on-screen overlay and CSV export.
+
+Enabled by setting the ROCKET_FLIGHT_PROFILE environment variable to "1", or toggled in game with F1.
+Setting ROCKET_FLIGHT_PROFILE_CSV to a path also enables it, and exports every profiled frame there
+as CSV when the game exits.
+"""
+
+import csv
+import os
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+
+import pyxel
+
+from . import consts
+
+ENV_VAR = "ROCKET_FLIGHT_PROFILE"
+CSV_ENV_VAR = "ROCKET_FLIGHT_PROFILE_CSV"
+TOGGLE_KEY = pyxel.KEY_F1
+WINDOW = 300  # Number of frames the rolling statistics are computed over
+
+# Sections of the simulation, timed per simulation step
+STEP_SECTIONS = (
+    "player.update",
+    "entity_manager.update_static",
+    "update_scrollables.generate",
+    "update_scrollables.move",
+    "update_scrollables.collide",
+)
+# Sections of the drawing, timed per displayed frame
+DRAW_SECTIONS = (
+    "background.draw",
+    "entity_manager.draw",
+)
+SECTIONS = STEP_SECTIONS + DRAW_SECTIONS
+
+
+class _Section:
+    """Times a block of code, as a context manager. Does nothing while the profiler is disabled."""
+
+    __slots__ = ("_start", "name", "profiler")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self._start: float | None = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self._start = perf_counter()
+
+    def __exit__(self, *_exc_info: object):
+        if self._start is not None:
+            self.profiler.current[self.name] += perf_counter() - self._start
+            self._start = None
+
+
+class Profiler:
+    """
+    Records how long each section takes every simulation step or displayed frame.
+
+    Sections are timed with `with profiler.section(name):`. The simulation runs at its own rate,
+    so a displayed frame may run any number of steps, including none. Simulation sections are
+    therefore closed every step with `end_step`, and drawing sections every frame with `end_frame`,
+    which also records the live entity counts.
+    Subsystems report other per-frame counts, such as their number of blits, with `count`.
+    """
+
+    def __init__(self, *, enabled: bool = False, csv_path: Path | None = None):
+        self.enabled = enabled
+        self.csv_path = csv_path  # Where to export every frame, if anywhere
+        self.record = csv_path is not None  # Whether to keep every frame, for CSV export
+        self._sections = {name: _Section(self, name) for name in SECTIONS}
+        self.current: dict[str, float] = dict.fromkeys(SECTIONS, 0.0)
+        self.durations: dict[str, deque[float]] = {name: deque(maxlen=WINDOW) for name in SECTIONS}
+        self.counts: dict[str, int] = {}
+        self.counters: dict[str, int] = {}  # Counts reported with `count` during the current frame
+        self.last_counters: dict[str, int] = {}
+        self.history: list[dict[str, float | str]] = []
+        self.frames: int = 0
+        self.steps: int = 0  # Steps closed during the current frame
+        self.step_totals: dict[str, float] = dict.fromkeys(STEP_SECTIONS, 0.0)  # Over the current frame's steps
+
+    @staticmethod
+    def from_env() -> "Profiler":
+        """
+        Configure a profiler from the environment variables.
+
+        The CSV path is resolved against the current working directory, so this should be called
+        before `pyxel.init`, which changes it.
+        """
+        enabled = os.environ.get(ENV_VAR, "")
+        if enabled not in {"", "0", "1"}:
+            msg = f'{ENV_VAR} should be "0" or "1", not {enabled!r}. Set {CSV_ENV_VAR} to export a CSV.'
+            raise ValueError(msg)
+        csv_path = os.environ.get(CSV_ENV_VAR)
+        return Profiler(
+            enabled=enabled == "1" or bool(csv_path), csv_path=Path(csv_path).resolve() if csv_path else None
+        )
+
+    def section(self, name: str) -> _Section:
+        return self._sections[name]
+
+    def count(self, name: str, value: int):
+        """Add to a count of the current frame. Does nothing while the profiler is disabled."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def end_step(self):
+        """Close the current simulation step's timings. Does nothing while the profiler is disabled."""
+        if not self.enabled:
+            return
+        current, durations, totals = self.current, self.durations, self.step_totals
+        for name in STEP_SECTIONS:
+            durations[name].append(current[name])
+            totals[name] += current[name]
+            current[name] = 0.0
+        self.steps += 1
+
+    def end_frame(self, counts: dict[str, int]):
+        """
+        Close the current frame's drawing timings and counters, along with the entity counts at its end.
+
+        A CSV row holds the mean of every simulation section over the frame's steps, left empty without any.
+        """
+        for name in DRAW_SECTIONS:
+            self.durations[name].append(self.current[name])
+        self.counts = counts
+        self.last_counters = self.counters
+        if self.record:
+            steps = self.steps
+            step_means = {name: total / steps if steps else "" for name, total in self.step_totals.items()}
+            draws = {name: self.current[name] for name in DRAW_SECTIONS}
+            self.history.append({"frame": self.frames, **step_means, **draws, **counts, **self.counters})
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.step_totals = dict.fromkeys(STEP_SECTIONS, 0.0)
+        self.steps = 0
+        self.counters = {}
+        self.frames += 1
+
+    def percentiles(self, name: str) -> tuple[float, float]:
+        """Return the rolling p50 and p99 of a section, per step or per frame, in seconds."""
+        durations = self.durations[name]
+        if len(durations) < 2:  # noqa: PLR2004 - quantiles require at least 2 data points
+            return (durations[0], durations[0]) if durations else (0.0, 0.0)
+        import statistics  # noqa: PLC0415 - slow to import, and only needed when profiling
+
+        quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+        return quantiles[49], quantiles[98]
+
+    def export_csv(self, path: Path | str):
+        if not self.history:
+            return
+        with Path(path).open("w", newline="") as file:
+            fieldnames = list(dict.fromkeys(name for row in self.history for name in row))
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval=0)
+            writer.writeheader()
+            writer.writerows(self.history)
+
+    def update(self):
+        if pyxel.btnp(TOGGLE_KEY):
+            self.enabled = not self.enabled
+
+    def draw(self, x: int = 4, y: int = 12):
+        """Draw the rolling statistics and entity counts as an overlay."""
+        lines = ["section              p50ms  p99ms"]
+        for name in SECTIONS:
+            p50, p99 = self.percentiles(name)
+            lines.append(f"{name[-20:]:<20} {p50 * 1000:5.2f}  {p99 * 1000:5.2f}")
+        lines.append(" ".join(f"{tag}:{count}" for tag, count in self.counts.items()))
+        lines.append(" ".join(f"{name}:{count}" for name, count in self.last_counters.items()))
+
+        pyxel.rect(x - 2, y - 2, consts.W - 2 * (x - 2), len(lines) * 7 + 3, 0)
+        for i, line in enumerate(lines):
+            pyxel.text(x, y + i * 7, line, 7)
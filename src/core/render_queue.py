@@ -0,0 +1,56 @@
+from typing import NamedTuple
+
+import pyxel
+
+from . import consts
+from .frame_manager import Frame
+
+
+class DrawCommand(NamedTuple):
+    x: float
+    y: float
+    frame: Frame
+
+
+class RenderQueue:
+    """
+    Collects the sprites to draw in a frame, and draws them in a single pass.
+
+    Sprites that are entirely off-screen are culled on submission. On flush, sprites are
+    grouped by image bank, keeping their submission order within each bank, so the
+    drawing order only depends on the order sprites were submitted in.
+    """
+
+    def __init__(self):
+        self.commands: list[DrawCommand] = []
+        self._culled: int = 0
+        # Stats of the last flushed frame
+        self.blits: int = 0
+        self.culled: int = 0
+
+    def submit(self, x: float, y: float, frame: Frame):
+        # Rotated or scaled sprites may cover more than their frame, so they're never culled
+        if (
+            frame.rotate is None
+            and frame.scale is None
+            and (x >= consts.W or y >= consts.H or x + abs(frame.w) < 0 or y + abs(frame.h) < 0)
+        ):
+            self._culled += 1
+            return
+        self.commands.append(DrawCommand(x, y, frame))
+
+    def flush(self):
+        """Draw all submitted sprites, and clear the queue."""
+        self.commands.sort(key=_image_bank)
+        blt = pyxel.blt
+        for x, y, frame in self.commands:
+            blt(x, y, *frame.blt_args)
+        self.blits, self.culled = len(self.commands), self._culled
+        self.commands.clear()
+        self._culled = 0
+
+
+def _image_bank(command: DrawCommand) -> int:
+    img = command.frame.img
+    # Images that aren't one of pyxel's image banks are drawn first
+    return img if isinstance(img, int) else -1
@@ -0,0 +1,174 @@
+"""
+Records the input of a game into a compact binary log, and replays it deterministically.
+
+A replay holds the game's seed and settings, the action input of every frame (2 bits per frame),
+and the frame and score of every game over, which replaying verifies.
+
+    python -m src.core.replay record <path>          Play the game, recording it
+    python -m src.core.replay play <path> [--speed]  Render a replay, at any speed
+    python -m src.core.replay verify <path>          Re-simulate a replay headlessly, at maximum speed, and
+                                                     check that it leads to the recorded game overs
+"""
+
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from .entity_manager import SpawnSettings
+from .game import Game, GameState
+
+MAGIC = b"RFRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBII")  # magic, version, seed, frame count
+FLAGS = struct.Struct("<B")  # Game settings, since version 2
+GAME_OVER = struct.Struct("<Id")  # frame, score
+FRAMES_PER_BYTE = 4
+
+PRESSED = 0b01
+HELD = 0b10
+
+PIXEL_MASKS = 0b1  # Flag of games whose diagonal lasers collide by their pixels
+
+
+class GameOver(NamedTuple):
+    frame: int
+    score: float
+
+
+class Replay:
+    """The seed, settings and per-frame input of a recorded game, and the game overs it led to."""
+
+    def __init__(
+        self,
+        seed: int,
+        inputs: bytearray | None = None,
+        game_overs: list[GameOver] | None = None,
+        *,
+        pixel_masks: bool = False,
+    ):
+        self.seed = seed
+        self.pixel_masks = pixel_masks
+        self.inputs = inputs if inputs is not None else bytearray()  # One input code per frame
+        self.game_overs = game_overs if game_overs is not None else []
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def append(self, *, action_pressed: bool, action_held: bool):
+        self.inputs.append(action_pressed * PRESSED | action_held * HELD)
+
+    def to_bytes(self) -> bytes:
+        packed = bytearray((len(self.inputs) + FRAMES_PER_BYTE - 1) // FRAMES_PER_BYTE)
+        for i, code in enumerate(self.inputs):
+            packed[i // FRAMES_PER_BYTE] |= code << (i % FRAMES_PER_BYTE * 2)
+        game_overs = b"".join(GAME_OVER.pack(*game_over) for game_over in self.game_overs)
+        header = HEADER.pack(MAGIC, VERSION, self.seed, len(self.inputs)) + FLAGS.pack(self.pixel_masks * PIXEL_MASKS)
+        return header + packed + game_overs
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Replay":
+        magic, version, seed, frames = HEADER.unpack_from(data)
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            msg = "Not a supported replay file"
+            raise ValueError(msg)
+        offset = HEADER.size
+        flags = 0
+        if version >= 2:  # noqa: PLR2004 - the flags were added in version 2
+            (flags,) = FLAGS.unpack_from(data, offset)
+            offset += FLAGS.size
+        packed = data[offset : offset + (frames + FRAMES_PER_BYTE - 1) // FRAMES_PER_BYTE]
+        inputs = bytearray((packed[i // FRAMES_PER_BYTE] >> (i % FRAMES_PER_BYTE * 2)) & 0b11 for i in range(frames))
+        offset += len(packed)
+        game_overs = [GameOver(*values) for values in GAME_OVER.iter_unpack(data[offset:])]
+        return Replay(seed, inputs, game_overs, pixel_masks=bool(flags & PIXEL_MASKS))
+
+    def save(self, path: Path | str):
+        Path(path).write_bytes(self.to_bytes())
+
+    @staticmethod
+    def load(path: Path | str) -> "Replay":
+        return Replay.from_bytes(Path(path).read_bytes())
+
+
+class Recorder:
+    """Updates a game, recording its input and game overs into a Replay."""
+
+    def __init__(self, game: Game):
+        if game.spawn_settings != SpawnSettings():
+            msg = "Replays don't record spawn settings, so only games with the default ones can be recorded"
+            raise ValueError(msg)
+        self.game = game
+        self.replay = Replay(game.seed, pixel_masks=game.pixel_masks)
+
+    def update(self, *, action_pressed: bool, action_held: bool):
+        game = self.game
+        was_over = game.state == GameState.GAME_OVER
+        frame = game.clock.frame_count
+        game.update(action_pressed=action_pressed, action_held=action_held)
+        self.replay.append(action_pressed=action_pressed, action_held=action_held)
+        if not was_over and game.state == GameState.GAME_OVER:
+            self.replay.game_overs.append(GameOver(frame, game.score))
+
+
+def replay_inputs(replay: Replay):
+    """Yield the (pressed, held) input of every frame."""
+    for code in replay.inputs:
+        yield bool(code & PRESSED), bool(code & HELD)
+
+
+def replay_game(replay: Replay, *, array_store: bool = False) -> Game:
+    """A new game with the replay's seed and settings, to re-simulate it."""
+    return Game(seed=replay.seed, array_store=array_store, pixel_masks=replay.pixel_masks, muted=True)
+
+
+def check_settings(replay: Replay, game: Game):
+    """Raise ValueError if the game's settings differ from the ones the replay was recorded with."""
+    if game.pixel_masks != replay.pixel_masks:
+        msg = f"The replay was recorded with pixel_masks={replay.pixel_masks}, but the game has {game.pixel_masks}"
+        raise ValueError(msg)
+
+
+def simulate(replay: Replay, game: Game | None = None) -> list[GameOver]:
+    """Re-simulate a replay headlessly, and return the game overs it led to."""
+    game = game or replay_game(replay)
+    check_settings(replay, game)
+    game.sounds.muted = True
+    recorder = Recorder(game)
+    for pressed, held in replay_inputs(replay):
+        recorder.update(action_pressed=pressed, action_held=held)
+    return recorder.replay.game_overs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("record", "play", "verify"))
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--speed", type=float, default=1, help="playback speed, for play")
+    parser.add_argument("--array-store", action="store_true", help="verify with entities in a NumPy ArrayStore")
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        replay = Replay.load(args.path)
+        start = time.perf_counter()
+        game_overs = simulate(replay, replay_game(replay, array_store=args.array_store))
+        elapsed = time.perf_counter() - start
+        print(f"{len(replay)} frames in {elapsed:.2f}s ({len(replay) / elapsed:.0f} fps)")  # noqa: T201
+        if game_overs != replay.game_overs:
+            print(f"Mismatch: recorded {replay.game_overs}, replayed {game_overs}")  # noqa: T201
+            sys.exit(1)
+        print(f"OK: {len(game_overs)} identical game overs")  # noqa: T201
+        return
+
+    from .main import App  # noqa: PLC0415 - the app initializes pyxel, which verify doesn't need
+
+    if args.command == "record":
+        App(record_path=args.path)
+    else:
+        App(replay=Replay.load(args.path), speed=args.speed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import random
+
+BLOCK_SIZE = 1024  # Number of random values generated at once
+
+
+class Rng:
+    """
+    A seedable random number stream, owned by a single game session.
+
+    Replaces the global `pyxel.rndi`/`pyxel.rndf`, so that runs with the same seed are reproducible.
+    Values are pre-generated in blocks to keep per-draw overhead low on the spawn path.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self.seed: int = random.getrandbits(32) if seed is None else seed
+        self._random = random.Random(self.seed)  # noqa: S311
+        self._block: list[float] = []
+        self._index = 0
+
+    def _refill(self):
+        rand = self._random.random
+        self._block = [rand() for _ in range(BLOCK_SIZE)]
+        self._index = 0
+
+    def uniform(self) -> float:
+        """Return a random float in [0, 1)."""
+        if self._index >= len(self._block):
+            self._refill()
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def uniform_batch(self, count: int) -> list[float]:
+        """Return `count` random floats in [0, 1)."""
+        values = self._block[self._index : self._index + count]
+        self._index += len(values)
+        while len(values) < count:
+            self._refill()
+            missing = count - len(values)
+            values += self._block[:missing]
+            self._index = missing
+        return values
+
+    def rndi(self, a: int, b: int) -> int:
+        """Return a random integer between a and b, inclusive, in either order. Same as `pyxel.rndi`."""
+        a, b = min(a, b), max(a, b)
+        return a + int(self.uniform() * (b - a + 1))
+
+    def rndf(self, a: float, b: float) -> float:
+        """Return a random float between a and b. Same as `pyxel.rndf`."""
+        return a + self.uniform() * (b - a)
+
+    def rndi_batch(self, a: int, b: int, count: int) -> list[int]:
+        a, b = min(a, b), max(a, b)
+        span = b - a + 1
+        return [a + int(u * span) for u in self.uniform_batch(count)]
+
+    def rndf_batch(self, a: float, b: float, count: int) -> list[float]:
+        span = b - a
+        return [a + u * span for u in self.uniform_batch(count)]
+
+    def spawn_seed(self) -> int:
+        """Draw a seed for a new, independent stream."""
+        return self._random.getrandbits(32)
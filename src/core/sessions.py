@@ -0,0 +1,91 @@
+"""
+Runs headless game sessions inside an asyncio event loop, e.g. to host many sessions in one server process.
+
+Simulation is CPU-bound, so a session hands control back to the event loop every `ticks_per_yield` frames,
+keeping the loop responsive while any number of sessions advance concurrently:
+
+    async def validate(replay: Replay) -> bool:
+        return await AsyncSession(replay_game(replay)).verify(replay)
+
+Every session owns its Game, and with it its own clock, random streams, camera, entities,
+spawn settings and sounds. Sessions only share read-only caches, such as animation frames and laser masks,
+so they don't affect each other.
+"""
+
+import asyncio
+from collections.abc import Generator
+from typing import TypeVar
+
+from .game import Game
+from .headless import DEFAULT_MAX_FRAMES, HeadlessRunner, InputPolicy, SessionResult, idle
+from .replay import GameOver, Recorder, Replay, check_settings, replay_inputs
+
+DEFAULT_TICKS_PER_YIELD = 256  # Frames simulated between yields to the event loop, a few milliseconds' worth
+
+T = TypeVar("T")
+
+
+class AsyncSession:
+    """
+    Steps a Game from a coroutine, yielding to the event loop every `ticks_per_yield` frames.
+
+        policy: Supplies the input, like for a HeadlessRunner.
+        ticks_per_yield: Frames to simulate between yields. Fewer keep the loop more responsive,
+            more spend less time switching between sessions.
+    """
+
+    def __init__(
+        self,
+        game: Game | None = None,
+        policy: InputPolicy = idle,
+        *,
+        ticks_per_yield: int = DEFAULT_TICKS_PER_YIELD,
+    ):
+        self.runner = HeadlessRunner(policy, game or Game())
+        self.ticks_per_yield = ticks_per_yield
+
+    @property
+    def game(self) -> Game:
+        return self.runner.game
+
+    async def _drive(self, steps: Generator[None, None, T]) -> T:
+        """Exhaust a generator that yields after every frame, yielding to the event loop periodically."""
+        ticks = 0
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+            ticks += 1
+            if ticks % self.ticks_per_yield == 0:
+                await asyncio.sleep(0)
+
+    async def run(self, frames: int):
+        """Advance the game by `frames` frames."""
+        await self._drive(self._steps(frames))
+
+    def _steps(self, frames: int) -> Generator[None, None, None]:
+        for _ in range(frames):
+            self.runner.step()
+            yield
+
+    async def run_session(self, max_frames: int = DEFAULT_MAX_FRAMES) -> SessionResult:
+        """Play a single session, like `HeadlessRunner.run_session`."""
+        return await self._drive(self.runner.play_session(max_frames))
+
+    async def simulate(self, replay: Replay) -> list[GameOver]:
+        """Re-simulate a replay's input, and return the game overs it led to, like `replay.simulate`."""
+        check_settings(replay, self.game)
+        recorder = Recorder(self.game)
+        await self._drive(_replay_steps(recorder, replay))
+        return recorder.replay.game_overs
+
+    async def verify(self, replay: Replay) -> bool:
+        """Whether a replay leads to the game overs it recorded. The game should be a new `replay_game(replay)`."""
+        return await self.simulate(replay) == replay.game_overs
+
+
+def _replay_steps(recorder: Recorder, replay: Replay) -> Generator[None, None, None]:
+    for pressed, held in replay_inputs(replay):
+        recorder.update(action_pressed=pressed, action_held=held)
+        yield
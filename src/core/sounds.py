@@ -1,31 +1,46 @@
 import pyxel
 
 
-class _Sounds:
+class Sounds:
+    """
+    Plays a game's sound effects. Every game owns one, so muting a game doesn't mute the others.
+
+        muted: Whether to play nothing, for running without a pyxel window, where audio is unavailable.
+    """
+
     FLY_SOUND_TIMEOUT = 4
 
-    def __init__(self):
+    def __init__(self, *, muted: bool = False):
         self._last_frame_played = 0
+        self.muted = muted
+
+    def _play(self, sound: int):
+        if not self.muted:
+            pyxel.play(3, sound)
 
     def transition(self):
         """
         Called when changing from main screen to playing mode, and from game over back to main screen.
         """
-        pyxel.play(3, 61)
+        self._play(61)
+
+    def fly(self, frame_count: int):
+        """
+        Called every frame the jetpack fires, and played at most once per `FLY_SOUND_TIMEOUT` frames.
 
-    def fly(self):
-        if pyxel.frame_count - self._last_frame_played > self.FLY_SOUND_TIMEOUT:
-            pyxel.play(3, 63)
-            self._last_frame_played = pyxel.frame_count
+            frame_count: The game's frame count, so the timeout is in simulated frames.
+        """
+        if self.muted:
+            return
+        if frame_count - self._last_frame_played > self.FLY_SOUND_TIMEOUT:
+            self._play(63)
+            self._last_frame_played = frame_count
 
     def catch_coin(self):
-        pyxel.play(3, 60)
+        self._play(60)
 
     def hit_scientist(self):
-        pyxel.play(3, 59)
+        self._play(59)
 
     def game_over(self):
-        pyxel.play(3, 62)
-
-
-sounds = _Sounds()
+        self._play(62)
@@ -0,0 +1,54 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.entities.entity import Entity, Rect
+
+
+def _left(entity: "Entity") -> float:
+    return entity.rect.x
+
+
+class SweepAndPrune:
+    """
+    Entities sorted by the left edge of their rect, as a collision broad phase.
+
+    Scrollables spawn at the right edge of the screen and leave at the left, so new entities are
+    almost always inserted at the end, and removed from the start. Since they keep still in world space,
+    the list only goes out of order while it holds entities with their own velocity. It's then re-sorted,
+    which takes close to linear time, since it's almost sorted.
+
+    Queries bisect into the x-interval they overlap. Entities are expected to keep their hitboxes within their rect.
+    """
+
+    def __init__(self):
+        self.entities: list[Entity] = []
+        self.movers: dict[Entity, None] = {}  # Entities with a velocity, which may move out of order
+        self.max_width: float = 0  # The widest rect, which bounds how far left of a query an overlap can start
+
+    def insert(self, entity: "Entity"):
+        insort(self.entities, entity, key=_left)
+        self.max_width = max(self.max_width, entity.rect.w)
+        if entity.vx:
+            self.movers[entity] = None
+
+    def remove(self, entity: "Entity"):
+        self.entities.remove(entity)  # Removed entities are usually the leftmost, found right away
+        self.movers.pop(entity, None)
+
+    def sort(self):
+        """Restore the order after entities moved. Should be called before querying."""
+        if self.movers:
+            self.entities.sort(key=_left)
+
+    def query(self, rect: "Rect", dx: float = 0) -> list["Entity"]:
+        """Return the entities whose rect overlaps `rect` moved by `dx`, sorted by their left edge."""
+        left, right, top, bottom = rect.left + dx, rect.right + dx, rect.top, rect.bottom
+        entities = self.entities
+        start = bisect_left(entities, left - self.max_width, key=_left)
+        stop = bisect_right(entities, right, key=_left, lo=start)
+        return [
+            entity
+            for entity in entities[start:stop]
+            if entity.rect.right >= left and entity.rect.top <= bottom and entity.rect.bottom >= top
+        ]
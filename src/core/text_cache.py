@@ -0,0 +1,18 @@
+"""
+Caches the layout of text, so the widths of strings that don't change aren't measured every frame.
+
+Text is drawn with `pyxel.text`, which rasterizes faster than blitting pre-rendered images of strings
+or digits from Python, as measured by `benchmarks/text.py`.
+"""
+
+from functools import lru_cache
+
+from .assets import assets
+
+DEFAULT_MAX_SIZE = 64  # Widths kept before the least recently measured is evicted
+
+
+@lru_cache(maxsize=DEFAULT_MAX_SIZE)
+def text_width(font: str, text: str) -> int:
+    """The width of a string in a font, by asset name."""
+    return assets.font(font).text_width(text)
@@ -0,0 +1,54 @@
+"""
+Decouples the simulation's tick rate from the display's frame rate.
+"""
+
+import time
+from collections.abc import Callable
+
+MAX_STEPS_PER_FRAME = 5  # Simulation steps a single frame may run to catch up, before the backlog is dropped
+
+
+class FixedTimestep:
+    """
+    Decides how many fixed-length simulation steps to run every displayed frame.
+
+    Elapsed real time is accumulated, and consumed in whole steps, so the simulation advances
+    at `tick_rate` steps per second regardless of the display's frame rate.
+    The leftover fraction of a step is `alpha`, for drawing between the last two simulated states.
+
+    After a long frame, the missed steps are run to catch up, but at most `max_steps` per frame,
+    and the rest of the backlog is dropped, so a machine too slow to keep up slows the game down
+    instead of spending ever longer frames catching up.
+
+        tick_rate: Simulation steps per second.
+        max_steps: The most steps to run in a single frame.
+        clock: Returns the current time, in seconds.
+    """
+
+    def __init__(
+        self,
+        tick_rate: float,
+        max_steps: int = MAX_STEPS_PER_FRAME,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.step_duration = 1 / tick_rate
+        self.max_steps = max_steps
+        self.clock = clock
+        self.last_time: float | None = None
+        self.accumulator = self.step_duration  # So the first frame runs a step
+        self.alpha: float = 0  # How far the displayed frame is past the last step, in steps
+        self.dropped: int = 0  # Steps dropped by the last frame, for falling too far behind
+
+    def steps(self) -> int:
+        """Return the number of simulation steps to run this frame, and update `alpha`."""
+        now = self.clock()
+        if self.last_time is not None:
+            self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = int(self.accumulator / self.step_duration)
+        self.dropped = max(0, steps - self.max_steps)
+        steps -= self.dropped
+        self.accumulator -= (steps + self.dropped) * self.step_duration
+        self.alpha = self.accumulator / self.step_duration
+        return steps
@@ -1,13 +1,18 @@
-from .coins import make_coins
+from .coins import coin_pool, make_coins
 from .lasers import make_laser
-from .player_bullets import make_player_bullets
-from .projectile import make_projectile
-from .scientist import Scientist
+from .player_bullets import bullet_pool, make_player_bullets
+from .projectile import make_projectile, projectile_pool
+from .scientist import Scientist, make_scientist, scientist_pool
 
 __all__ = [
     "Scientist",
+    "bullet_pool",
+    "coin_pool",
     "make_coins",
     "make_laser",
     "make_player_bullets",
     "make_projectile",
+    "make_scientist",
+    "projectile_pool",
+    "scientist_pool",
 ]
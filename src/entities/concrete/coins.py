@@ -1,13 +1,15 @@
-import pyxel
+from functools import cache
+from typing import NamedTuple
 
 from src.core import consts
 from src.core.frame_manager import Frame, FrameManager
+from src.core.rng import Rng
 from src.entities.entity import Entity, Rect
+from src.entities.pool import EntityPool
 
 COIN_SIZE = 11
 COIN_GAP = 3
 START_X = consts.W
-COIN_FRAMES = (Frame(0, consts.TILE_SIZE * 1, consts.TILE_SIZE * 6, COIN_SIZE, COIN_SIZE),)
 
 SHAPE_SQUARE = """
 ****
@@ -51,23 +53,59 @@ ____*
 SHAPES = (SHAPE_SQUARE, SHAPE_ARROW, SHAPE_HORIZONTAL_LINE, SHAPE_ASCENDING_LINE, SHAPE_DESCENDING_LINE)
 
 
-def make_coins() -> set[Entity]:
-    """Return a set of coins that form a shape from a random pool of shapes"""
-    coins: set[Entity] = set()
-    shape = SHAPES[pyxel.rndi(0, len(SHAPES) - 1)]
+class ShapeTemplate(NamedTuple):
+    """A coin shape, compiled into the coins' positions relative to the shape's top-left corner."""
 
+    height: int
+    offsets: tuple[tuple[int, int], ...]
+
+
+def compile_shape(shape: str) -> ShapeTemplate:
     rows = list(shape.split("\n"))
     full_height = COIN_SIZE * len(rows) + (len(rows) - 1) * COIN_GAP
-    start_y = pyxel.rndi(consts.CEILING_Y, consts.FLOOR_Y - full_height)
-
-    for i, row in enumerate(rows):
-        for j, char in enumerate(row):
-            if char == "*":
-                x = START_X + j * (COIN_SIZE + COIN_GAP)
-                y = start_y + i * (COIN_SIZE + COIN_GAP)
-                coin_rect = Rect(x, y, COIN_SIZE, COIN_SIZE)
-                coin = Entity(coin_rect)
-                coin.frame_manager = FrameManager(COIN_FRAMES)
-                coins.add(coin)
+    offsets = tuple(
+        (j * (COIN_SIZE + COIN_GAP), i * (COIN_SIZE + COIN_GAP))
+        for i, row in enumerate(rows)
+        for j, char in enumerate(row)
+        if char == "*"
+    )
+    return ShapeTemplate(full_height, offsets)
+
+
+@cache
+def shape_templates() -> tuple[ShapeTemplate, ...]:
+    """The compiled shapes, compiled on first use."""
+    return tuple(compile_shape(shape) for shape in SHAPES)
+
+
+@cache
+def coin_animation() -> FrameManager:
+    """The animation shared by all coins."""
+    return FrameManager((Frame(0, consts.TILE_SIZE * 1, consts.TILE_SIZE * 6, COIN_SIZE, COIN_SIZE),))
+
+
+def _new_coin() -> Entity:
+    coin = Entity(Rect(0, 0, COIN_SIZE, COIN_SIZE))
+    coin.frame_manager = coin_animation()
+    return coin
+
+
+def coin_pool() -> EntityPool:
+    """A new pool of coins, for `make_coins`."""
+    return EntityPool(_new_coin)
+
+
+def make_coins(rng: Rng, pool: EntityPool) -> list[Entity]:
+    """Return a list of coins that form a shape from a random pool of shapes"""
+    coins: list[Entity] = []
+    templates = shape_templates()
+    template = templates[rng.rndi(0, len(templates) - 1)]
+    start_y = rng.rndi(consts.CEILING_Y, consts.FLOOR_Y - template.height)
+
+    for offset_x, offset_y in template.offsets:
+        coin = pool.acquire()
+        coin.rect.x = START_X + offset_x
+        coin.rect.y = start_y + offset_y
+        coins.append(coin)
 
     return coins
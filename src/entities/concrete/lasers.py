@@ -5,20 +5,32 @@ with corresponding hitboxes for precise collision detection.
 
 For external use, the `make_laser` function is the main entry point, enabling the generation of a random
 laser entity with varying size and alignment.
+
+The layout of each laser kind and size (frames, part offsets and hitboxes) is compiled once into a
+LaserTemplate, so spawning a laser only instantiates its template at a random y.
+
+Diagonal lasers can optionally collide pixel-accurately, with collision masks baked from the sprite sheet
+by `collision_mask`, instead of their chain of square hitboxes.
 """
 
-from collections.abc import Callable, Iterable
+from collections.abc import Callable
+from functools import cache
+from typing import NamedTuple
 
 import pyxel
 
 from src.core import consts
+from src.core.assets import RESOURCE_FILE, assets
 from src.core.consts import TILE_SIZE
 from src.core.frame_manager import Frame, FrameManager
+from src.core.rng import Rng
 from src.entities.entity import Entity, EntityPart, HitBox, Rect
+from src.entities.mask import CollisionMask
 
 # constants
 FRAME_COUNT = 4  # Total of frames for each laser part
-LASER_SIZE_BOUNDS = (3, 6)  # min size and max size for random laser generation
+LASER_SIZE_BOUNDS = (3, 6)  # Default min size and max size for random laser generation
+MASKS_ENV_VAR = "ROCKET_FLIGHT_PIXEL_MASKS"  # Set to "1" for the app to collide diagonal lasers by their pixels
 
 HALF_TILE = TILE_SIZE // 2
 LASER_X = consts.W
@@ -50,8 +62,12 @@ def diag_offset(size: int) -> tuple[int, int]:
     return edge, edge
 
 
+# (x, y, w, h) of a hitbox, relative to the laser's origin
+HitBoxSpec = tuple[float, float, float, float]
+
+
 # General helper functions
-def make_frame_manager(  # noqa: PLR0913
+def make_frames(  # noqa: PLR0913
     base_u: float,
     base_v: float,
     step_u: float,
@@ -61,22 +77,17 @@ def make_frame_manager(  # noqa: PLR0913
     img: pyxel.Image | int = 0,
     colkey: int = consts.IMG_COLKEY,
     count: int = FRAME_COUNT,
-    frame_delay: int = 2,
-):
+) -> tuple[Frame, ...]:
     """
-    Create a FrameManager with a sequence of frames.
+    Create a sequence of frames for a FrameManager.
 
     All frames are generated from the given pyxel image, with the
-    given base position and step sizes. The other parameters are
-    forwarded to the FrameManager constructor.
+    given base position and step sizes.
 
         base_u, base_v: The x and y of the first frame in the image.
         step_u, step_v: The xand y steps between frames.
     """
-    return FrameManager(
-        tuple(Frame(img, base_u + step_u * i, base_v + step_v * i, width, height, colkey) for i in range(count)),
-        frame_delay=frame_delay,
-    )
+    return tuple(Frame(img, base_u + step_u * i, base_v + step_v * i, width, height, colkey) for i in range(count))
 
 
 def make_hitboxes(  # noqa: PLR0913
@@ -87,7 +98,7 @@ def make_hitboxes(  # noqa: PLR0913
     width: float,
     height: float,
     count: int,
-):
+) -> tuple[HitBoxSpec, ...]:
     """
     Generate hitboxes for laser parts.
 
@@ -96,141 +107,205 @@ def make_hitboxes(  # noqa: PLR0913
         width, height: Dimensions of hitboxes.
         count: Number of hitboxes.
     """
-    return [HitBox(base_x + step_x * i, base_y + step_y * i, width, height) for i in range(count)]
+    return tuple((base_x + step_x * i, base_y + step_y * i, width, height) for i in range(count))
 
 
-def make_parts(frame_managers: Iterable[FrameManager], offsets: Iterable[tuple[float, float]]):
-    """
-    Combine frame managers with their offsets into a sequence of parts.
+def generate_y(height: int, rng: Rng):
+    """Randomaly generate the laser's y, taking into account height"""
+    return rng.rndi(consts.CEILING_Y + 2, consts.FLOOR_Y - height)
 
-        frame_managers: An iterable of FrameManager objects.
-        offsets: An iterable of (x, y) tuples.
 
-    Returns a generator of parts.
+class LaserTemplate(NamedTuple):
     """
-    return tuple(
-        EntityPart(frame_manager, offset) for frame_manager, offset in zip(frame_managers, offsets, strict=False)
-    )
-
-
-def generate_y(height: int):
-    """Randomaly generate the laser's y, taking into account height"""
-    return pyxel.rndi(consts.CEILING_Y + 2, consts.FLOOR_Y - height)
+    The precomputed layout of a laser of a specific kind and size.
 
+        animations: The laser's animations, shared by every laser made from the template.
+            Parts sharing an animation stay in sync.
+        parts: (animation index, offset) for each part, in drawing order.
+        hitboxes: The laser's hitboxes.
+    """
 
-def make_horizontal(size: int) -> set[Entity]:
-    width = BASE_W * 2 + MIDDLE_W * size
-    height = BASE_H
-    y = generate_y(height)
-
-    # Define frame managers for left, middle, and right parts
-    left_frame = make_frame_manager(TILE_SIZE, TILE_SIZE * 3, HALF_TILE, 0, BASE_W, BASE_H)
-    middle_frame = make_frame_manager(TILE_SIZE * 3, TILE_SIZE * 3, TILE_SIZE, 0, MIDDLE_W, MIDDLE_H)
-    right_frame = make_frame_manager(TILE_SIZE, TILE_SIZE * 3, HALF_TILE, 0, -BASE_W, BASE_H)
+    width: int
+    height: int
+    animations: tuple[FrameManager, ...]
+    parts: tuple[tuple[int, tuple[float, float]], ...]
+    hitboxes: tuple[HitBoxSpec, ...]
+
+    def instantiate(self, y: float, mask: CollisionMask | None = None) -> Entity:
+        """Create a laser at `y`. With a collision mask, the laser gets a single hitbox over its whole rect."""
+        animations = self.animations
+        parts = tuple(EntityPart(animations[animation], offset) for animation, offset in self.parts)
+        hitboxes = None if mask is not None else [HitBox(*hitbox) for hitbox in self.hitboxes]
+        laser = Entity(Rect(LASER_X, y, self.width, self.height), parts=parts, hitboxes=hitboxes)
+        laser.mask = mask
+        return laser
+
+    def bake_mask(self, image: pyxel.Image) -> CollisionMask:
+        """Bake the opaque pixels of every frame of every part, so the mask covers the whole animation."""
+        mask = CollisionMask(self.width, self.height)
+        frame_masks = {}
+        for animation, (x, y) in self.parts:
+            for i, frame in enumerate(self.animations[animation].sequence):
+                key = (animation, i)
+                if key not in frame_masks:
+                    frame_masks[key] = CollisionMask.from_frame(frame, image)
+                mask.add(frame_masks[key], int(x), int(y))
+        return mask
+
+
+@cache
+def horizontal_template(size: int) -> LaserTemplate:
+    # Define animations for left, middle, and right parts
+    left, middle, right = 0, 1, 2
+    animations = (
+        make_frames(TILE_SIZE, TILE_SIZE * 3, HALF_TILE, 0, BASE_W, BASE_H),
+        make_frames(TILE_SIZE * 3, TILE_SIZE * 3, TILE_SIZE, 0, MIDDLE_W, MIDDLE_H),
+        make_frames(TILE_SIZE, TILE_SIZE * 3, HALF_TILE, 0, -BASE_W, BASE_H),
+    )
 
-    # Create parts with frame managers and offsets
-    parts = (EntityPart(left_frame),)
-    parts += tuple(EntityPart(middle_frame, (BASE_W + m * MIDDLE_W, MIDDLE_Y_OFFSET)) for m in range(size))
-    parts += (EntityPart(right_frame, (BASE_W + size * MIDDLE_W, 0)),)
+    # Create parts with animations and offsets
+    parts = ((left, (0, 0)),)
+    parts += tuple((middle, (BASE_W + m * MIDDLE_W, MIDDLE_Y_OFFSET)) for m in range(size))
+    parts += ((right, (BASE_W + size * MIDDLE_W, 0)),)
 
     # Define hitboxes for each section
-    hitboxes = [HitBox(0, 0, BASE_W, BASE_H)]
+    hitboxes = ((0, 0, BASE_W, BASE_H),)
     hitboxes += make_hitboxes(BASE_W, MIDDLE_Y_OFFSET, MIDDLE_W, 0, MIDDLE_W, MIDDLE_H, size)
-    hitboxes += [HitBox(BASE_W + size * MIDDLE_W, 0, BASE_W, BASE_H)]
+    hitboxes += ((BASE_W + size * MIDDLE_W, 0, BASE_W, BASE_H),)
 
-    return {
-        Entity(Rect(LASER_X, y, width, height), parts=parts, hitboxes=hitboxes),
-    }
-
-
-def make_vertical(size: int) -> set[Entity]:
-    size = min(4, size)  # for vertical lasers, maximum size is too difficult
+    return LaserTemplate(BASE_W * 2 + MIDDLE_W * size, BASE_H, tuple(map(FrameManager, animations)), parts, hitboxes)
 
-    height = BASE_W * 2 + size * TILE_SIZE
-    y = generate_y(height)
 
-    # Define frame managers for left, middle, and right parts
-    top_frame = make_frame_manager(0, TILE_SIZE * 4, TILE_SIZE, 0, BASE_H, BASE_W)
-    middle_frame = make_frame_manager(TILE_SIZE * 4, TILE_SIZE * 4, TILE_SIZE, 0, MIDDLE_H, MIDDLE_W)
-    bottom_frame = make_frame_manager(0, TILE_SIZE * 4, TILE_SIZE, 0, BASE_H, -BASE_W)
+@cache
+def vertical_template(size: int) -> LaserTemplate:
+    # Define animations for top, middle, and bottom parts
+    top, middle, bottom = 0, 1, 2
+    animations = (
+        make_frames(0, TILE_SIZE * 4, TILE_SIZE, 0, BASE_H, BASE_W),
+        make_frames(TILE_SIZE * 4, TILE_SIZE * 4, TILE_SIZE, 0, MIDDLE_H, MIDDLE_W),
+        make_frames(0, TILE_SIZE * 4, TILE_SIZE, 0, BASE_H, -BASE_W),
+    )
 
-    # Create parts with frame managers and offsets
-    parts = (EntityPart(top_frame),)
-    parts += tuple(EntityPart(middle_frame, (MIDDLE_Y_OFFSET, BASE_W + m * MIDDLE_W)) for m in range(size))
-    parts += (EntityPart(bottom_frame, (0, BASE_W + size * MIDDLE_W)),)
+    # Create parts with animations and offsets
+    parts = ((top, (0, 0)),)
+    parts += tuple((middle, (MIDDLE_Y_OFFSET, BASE_W + m * MIDDLE_W)) for m in range(size))
+    parts += ((bottom, (0, BASE_W + size * MIDDLE_W)),)
 
     # Define hitboxes for each section
-    hitboxes = [HitBox(0, 0, BASE_H, BASE_W)]
+    hitboxes = ((0, 0, BASE_H, BASE_W),)
     hitboxes += make_hitboxes(MIDDLE_Y_OFFSET, BASE_W, 0, MIDDLE_W, MIDDLE_H, MIDDLE_W, size)
-    hitboxes += [(HitBox(0, BASE_W + size * MIDDLE_W, BASE_H, BASE_W))]
+    hitboxes += ((0, BASE_W + size * MIDDLE_W, BASE_H, BASE_W),)
 
-    return {
-        Entity(Rect(LASER_X, y, BASE_H, height), parts=parts, hitboxes=hitboxes),
-    }
+    return LaserTemplate(BASE_H, BASE_W * 2 + size * TILE_SIZE, tuple(map(FrameManager, animations)), parts, hitboxes)
 
 
-def make_diagonal1(size: int) -> set[Entity]:
-    """A single diagonal laser, top-left to bottom-right"""
+@cache
+def diagonal1_template(size: int) -> LaserTemplate:
     height = D_HALF * 2 + D_HALF * size
-    y = generate_y(height)
 
-    # Define frame managers for left, middle, and right parts
-    left_frame = make_frame_manager(0, D_BASE_V, TILE_SIZE, 0, D_PART_W, D_PART_H)
-    middle_frame = make_frame_manager(TILE_SIZE * 4, D_BASE_V, TILE_SIZE, 0, D_PART_W, D_PART_H)
-    right_frame = make_frame_manager(0, D_BASE_V, TILE_SIZE, 0, -D_PART_W, -D_PART_H)
+    # Define animations for left, middle, and right parts
+    left, middle, right = 0, 1, 2
+    animations = (
+        make_frames(0, D_BASE_V, TILE_SIZE, 0, D_PART_W, D_PART_H),
+        make_frames(TILE_SIZE * 4, D_BASE_V, TILE_SIZE, 0, D_PART_W, D_PART_H),
+        make_frames(0, D_BASE_V, TILE_SIZE, 0, -D_PART_W, -D_PART_H),
+    )
 
-    # Create parts with frame managers and offsets
-    parts = tuple(EntityPart(middle_frame, (D_HALF * m, D_HALF * m)) for m in range(1, size))
-    parts += (EntityPart(left_frame),)
-    parts += (EntityPart(right_frame, (diag_middle_edge(size), diag_middle_edge(size))),)
+    # Create parts with animations and offsets
+    parts = tuple((middle, (D_HALF * m, D_HALF * m)) for m in range(1, size))
+    parts += ((left, (0, 0)),)
+    parts += ((right, (diag_middle_edge(size), diag_middle_edge(size))),)
 
     # Define hitboxes for each section
-    hitboxes = [HitBox(D_BASE_HITBOX_OFFSET, D_BASE_HITBOX_OFFSET, D_HALF + 1, D_HALF + 1)]
+    hitboxes = ((D_BASE_HITBOX_OFFSET, D_BASE_HITBOX_OFFSET, D_HALF + 1, D_HALF + 1),)
     hitboxes += make_hitboxes(D_HALF, D_HALF, D_HALF, D_HALF, D_HALF, D_HALF, size)
-    hitboxes += [HitBox(diag_offset(size)[0], diag_offset(size)[1], D_HALF + 1, D_HALF + 1)]
+    hitboxes += ((diag_offset(size)[0], diag_offset(size)[1], D_HALF + 1, D_HALF + 1),)
 
-    return {
-        Entity(Rect(LASER_X, y, height, height), parts=parts, hitboxes=hitboxes),
-    }
+    return LaserTemplate(height, height, tuple(map(FrameManager, animations)), parts, hitboxes)
 
 
-def make_diagonal2(size: int) -> set[Entity]:
-    """A single diagonal laser, bottom-left to top-right"""
+@cache
+def diagonal2_template(size: int) -> LaserTemplate:
     height = D_HALF * 2 + D_HALF * size
-    y = generate_y(height)
-
-    # Define frame managers for left, middle, and right parts
-    left_frame = make_frame_manager(0, D_BASE_V, TILE_SIZE, 0, D_PART_W, -D_PART_H)
-    middle_frame = make_frame_manager(TILE_SIZE * 4, D_BASE_V, TILE_SIZE, 0, D_PART_W, -D_PART_H)
-    right_frame = make_frame_manager(0, D_BASE_V, TILE_SIZE, 0, -D_PART_W, D_PART_H)
 
-    # Create parts with frame managers and offsets
+    # Define animations for left, middle, and right parts
+    left, middle, right = 0, 1, 2
+    animations = (
+        make_frames(0, D_BASE_V, TILE_SIZE, 0, D_PART_W, -D_PART_H),
+        make_frames(TILE_SIZE * 4, D_BASE_V, TILE_SIZE, 0, D_PART_W, -D_PART_H),
+        make_frames(0, D_BASE_V, TILE_SIZE, 0, -D_PART_W, D_PART_H),
+    )
 
-    parts = tuple(EntityPart(middle_frame, (D_HALF * m, D_HALF * (size - m))) for m in range(1, size))
-    parts += (EntityPart(left_frame, (0, diag_middle_edge(size))),)
-    parts += (EntityPart(right_frame, (diag_middle_edge(size), 0)),)
+    # Create parts with animations and offsets
+    parts = tuple((middle, (D_HALF * m, D_HALF * (size - m))) for m in range(1, size))
+    parts += ((left, (0, diag_middle_edge(size))),)
+    parts += ((right, (diag_middle_edge(size), 0)),)
 
     # Define hitboxes for each section
-    hitboxes = [HitBox(D_BASE_HITBOX_OFFSET, diag_offset(size)[1], D_HALF + 1, D_HALF + 1)]
+    hitboxes = ((D_BASE_HITBOX_OFFSET, diag_offset(size)[1], D_HALF + 1, D_HALF + 1),)
     hitboxes += make_hitboxes(D_HALF, diag_middle_edge(size), D_HALF, -D_HALF, D_HALF, D_HALF, size)
-    hitboxes += [(HitBox(diag_offset(size)[0], D_BASE_HITBOX_OFFSET, D_HALF + 1, D_HALF + 1))]
+    hitboxes += ((diag_offset(size)[0], D_BASE_HITBOX_OFFSET, D_HALF + 1, D_HALF + 1),)
+
+    return LaserTemplate(height, height, tuple(map(FrameManager, animations)), parts, hitboxes)
+
 
-    return {
-        Entity(Rect(LASER_X, y, height, height), parts=parts, hitboxes=hitboxes),
-    }
+@cache
+def collision_mask(template: Callable[[int], LaserTemplate], size: int) -> CollisionMask:
+    """
+    The collision mask of a laser template, baked on first use.
+
+    Baked from the sprite sheet as stored in the resource file, rather than from pyxel's loaded image bank,
+    so masks are identical in the app and in the headless simulation.
+    """
+    return template(size).bake_mask(assets.image_bank(RESOURCE_FILE, 0))
 
 
-def make_diagonals(size: int) -> set[Entity]:
+def bake_collision_masks(size_bounds: tuple[int, int] = LASER_SIZE_BOUNDS):
+    """Bake the collision masks of every size of diagonal laser within `size_bounds`, ahead of their first use."""
+    for size in range(size_bounds[0], size_bounds[1] + 1):
+        for template in (diagonal1_template, diagonal2_template):
+            collision_mask(template, size)
+
+
+def make_horizontal(size: int, rng: Rng, *, pixel_masks: bool = False) -> list[Entity]:  # noqa: ARG001
+    template = horizontal_template(size)
+    return [template.instantiate(generate_y(template.height, rng))]
+
+
+def make_vertical(size: int, rng: Rng, *, pixel_masks: bool = False) -> list[Entity]:  # noqa: ARG001
+    size = min(4, size)  # for vertical lasers, maximum size is too difficult
+    template = vertical_template(size)
+    return [template.instantiate(generate_y(template.height, rng))]
+
+
+def make_diagonal1(size: int, rng: Rng, *, pixel_masks: bool = False) -> list[Entity]:
+    """A single diagonal laser, top-left to bottom-right"""
+    template = diagonal1_template(size)
+    mask = collision_mask(diagonal1_template, size) if pixel_masks else None
+    return [template.instantiate(generate_y(template.height, rng), mask)]
+
+
+def make_diagonal2(size: int, rng: Rng, *, pixel_masks: bool = False) -> list[Entity]:
+    """A single diagonal laser, bottom-left to top-right"""
+    template = diagonal2_template(size)
+    mask = collision_mask(diagonal2_template, size) if pixel_masks else None
+    return [template.instantiate(generate_y(template.height, rng), mask)]
+
+
+def make_diagonals(size: int, rng: Rng, *, pixel_masks: bool = False) -> list[Entity]:
     """An X shape, 2 diagonals laid on top of each other"""
     size = max(2, size)  # Ensure size is bigger than 1 (size 1 looks wierd)
-    diag1_entity = next(iter(make_diagonal1(size)))
-    diag2_entity = next(iter(make_diagonal2(size)))
+    diag1_entity = make_diagonal1(size, rng, pixel_masks=pixel_masks)[0]
+    diag2_entity = make_diagonal2(size, rng, pixel_masks=pixel_masks)[0]
     diag2_entity.rect.y = diag1_entity.rect.y
-    return {diag1_entity, diag2_entity}
+    return [diag1_entity, diag2_entity]
 
 
+# Makes lasers of a size, with a `pixel_masks` keyword for colliding by their pixels
+LaserMaker = Callable[..., list[Entity]]
+
 # A laser making function is chosen randomly from here
-LASER_MAKERS: tuple[Callable[[int], set[Entity]], ...] = (
+LASER_MAKERS: tuple[LaserMaker, ...] = (
     make_horizontal,
     make_vertical,
     make_diagonal1,
@@ -239,11 +314,25 @@ LASER_MAKERS: tuple[Callable[[int], set[Entity]], ...] = (
 )
 
 
-def make_laser() -> set[Entity]:
+def make_laser(
+    rng: Rng,
+    *,
+    size_bounds: tuple[int, int] = LASER_SIZE_BOUNDS,
+    pixel_masks: bool = False,
+    makers: tuple[LaserMaker, ...] = LASER_MAKERS,
+) -> list[Entity]:
     """
     Generate lasers of random size and alignment.
     The main Entry point.
+
+        size_bounds: The min size and max size of the lasers.
+        pixel_masks: Whether diagonal lasers collide by their pixels, instead of by their hitboxes.
+            Sessions only replay identically with the same setting.
+        makers: The laser makers to choose from.
     """
-    size = pyxel.rndi(*LASER_SIZE_BOUNDS)
-    laser_maker = LASER_MAKERS[pyxel.rndi(0, len(LASER_MAKERS) - 1)]
-    return laser_maker(size)
+    size = rng.rndi(*size_bounds)
+    laser_maker = makers[rng.rndi(0, len(makers) - 1)]
+    lasers = laser_maker(size, rng, pixel_masks=pixel_masks)
+    for laser in lasers:
+        laser.kind = laser_maker.__name__
+    return lasers
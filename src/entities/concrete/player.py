@@ -1,10 +1,8 @@
+from functools import cache
 from typing import TYPE_CHECKING, NamedTuple
 
-import pyxel
-
 from src.core.consts import CEILING_Y, FLOOR_Y, TILE_SIZE
 from src.core.frame_manager import Frame, FrameManager
-from src.core.sounds import sounds
 from src.entities.entity import Entity, Rect
 
 if TYPE_CHECKING:
@@ -34,7 +32,7 @@ class PlayerState:
 class PlayerStartState(PlayerState):
     @staticmethod
     def enter(player: "Player"):
-        player.frame_manager = player.FRAME_MANAGERS.run
+        player.frame_manager = player.frame_managers.run
         player.rect.right = 0
         player.rect.bottom = FLOOR_Y - 1
         player.vx = player.ENTER_VX
@@ -59,7 +57,7 @@ class PlayerPlayState(PlayerState):
             player.rect.bottom = FLOOR_Y - 1
             player.vy = 0
             player.ay = 0
-            player.frame_manager = player.FRAME_MANAGERS.run
+            player.frame_manager = player.frame_managers.run
             player.is_flying = False
         # handle ceiling
         if player.rect.top <= CEILING_Y:
@@ -75,11 +73,11 @@ class PlayerPlayState(PlayerState):
 class PlayerGameOverState(PlayerState):
     @staticmethod
     def enter(player: "Player"):
-        sounds.game_over()
+        player.entity_manager.sounds.game_over()
         player.vx = player.GAMEOVER_VELOCITY[0]
         player.vy = player.GAMEOVER_VELOCITY[1]
         player.ay = player.FALL_ACCELERATION
-        player.frame_manager = player.FRAME_MANAGERS.gameover
+        player.frame_manager = player.frame_managers.gameover
 
     @staticmethod
     def update(player: "Player"):
@@ -102,6 +100,17 @@ class FrameManagerRecord(NamedTuple):
     gameover: FrameManager
 
 
+@cache
+def player_frame_managers() -> FrameManagerRecord:
+    """The FrameManagers of the player's states, shared by all players. Built on first use, rather than on import."""
+    return FrameManagerRecord(
+        fly=FrameManager(tuple(Frame(0, TILE_SIZE * i, 0, TILE_SIZE, TILE_SIZE) for i in range(1, 5))),
+        fall=FrameManager((Frame(0, TILE_SIZE * 3, TILE_SIZE, TILE_SIZE, TILE_SIZE),)),
+        run=FrameManager(tuple(Frame(0, TILE_SIZE * i, TILE_SIZE, TILE_SIZE, TILE_SIZE) for i in range(7))),
+        gameover=FrameManager((Frame(0, TILE_SIZE * 7, TILE_SIZE, TILE_SIZE, TILE_SIZE),)),
+    )
+
+
 class Player(Entity):
     W = 12
     H = 16
@@ -115,13 +124,6 @@ class Player(Entity):
     GAMEOVER_VELOCITY = (3, -3)
     GAMEOVER_SLIDE_ACCELERATION = -0.1
 
-    FRAME_MANAGERS = FrameManagerRecord(
-        fly=FrameManager(tuple(Frame(0, TILE_SIZE * i, 0, TILE_SIZE, TILE_SIZE) for i in range(1, 5))),
-        fall=FrameManager((Frame(0, TILE_SIZE * 3, TILE_SIZE, TILE_SIZE, TILE_SIZE),)),
-        run=FrameManager(tuple(Frame(0, TILE_SIZE * i, TILE_SIZE, TILE_SIZE, TILE_SIZE) for i in range(7))),
-        gameover=FrameManager((Frame(0, TILE_SIZE * 7, TILE_SIZE, TILE_SIZE, TILE_SIZE),)),
-    )
-
     def __init__(self, entity_manager: "EntityManager"):
         super().__init__(Rect(0, 0, Player.W, Player.H))
         self.ay: float = 0.0
@@ -131,14 +133,25 @@ class Player(Entity):
         self.coins = 0
         self.key_is_pressed = False
         self.is_flying = False
+        self.previous_x, self.previous_y = self.rect.x, self.rect.y  # Position before the current frame
+
+    @property
+    def frame_managers(self) -> FrameManagerRecord:
+        return player_frame_managers()
 
     def update(self):
+        self.previous_x, self.previous_y = self.rect.x, self.rect.y
         super().update()
         self.vy += max(min(self.ay, self.MAX_SPEED), -self.MAX_SPEED)
         self.vx += min(self.ax, self.MAX_SPEED)
         self.state.update(self)
         self.key_is_pressed = False
 
+    def interpolation_offset(self, alpha: float) -> tuple[float, float]:
+        """The offset from the player's position to a fraction `alpha` of the way from its previous one."""
+        back = alpha - 1
+        return (self.rect.x - self.previous_x) * back, (self.rect.y - self.previous_y) * back
+
     def collect_coins(self):
         coins = self.coins
         self.coins = 0
@@ -147,16 +160,16 @@ class Player(Entity):
     def fly(self):
         if not self.is_flying:
             self.ay = self.JETPACK_ACCELERATION
-            self.frame_manager = self.FRAME_MANAGERS.fly
+            self.frame_manager = self.frame_managers.fly
             self.is_flying = True
-        if pyxel.frame_count % 3 == 0:
-            sounds.fly()
+        if self.entity_manager.clock.frame_count % 3 == 0:
+            self.entity_manager.sounds.fly(self.entity_manager.clock.frame_count)
             self.entity_manager.make_player_bullets(self.rect)
 
     def fall(self):
         if self.is_flying:
             self.ay = self.FALL_ACCELERATION
-            self.frame_manager = self.FRAME_MANAGERS.fall
+            self.frame_manager = self.frame_managers.fall
             self.is_flying = False
 
     def set_state(self, state: type[PlayerState]):
@@ -1,8 +1,10 @@
-import pyxel
+from functools import cache
 
 from src.core import consts
 from src.core.frame_manager import Frame, FrameManager
+from src.core.rng import Rng
 from src.entities.entity import Entity, Rect
+from src.entities.pool import EntityPool
 
 BULLET_W = 3
 BULLET_H = 4
@@ -10,19 +12,35 @@ BULLET_VY_RANGE = (3, 4)
 BULLET_VX_RANGE = (-0.5, 0.4)
 MAX_BULLETS = 3
 
-FRAMES = (Frame(0, 2 * consts.TILE_SIZE, 6 * consts.TILE_SIZE, BULLET_W, BULLET_H),)
 
+@cache
+def bullet_animation() -> FrameManager:
+    """The animation shared by all bullets."""
+    return FrameManager((Frame(0, 2 * consts.TILE_SIZE, 6 * consts.TILE_SIZE, BULLET_W, BULLET_H),))
 
-def _make_bullet(player_rect: Rect):
-    x = pyxel.rndf(player_rect.left, player_rect.left + player_rect.w / 2 - BULLET_W)
 
-    bullet = Entity(Rect(x, player_rect.bottom, BULLET_W, BULLET_H))
-    bullet.frame_manager = FrameManager(FRAMES)
-    bullet.vy = pyxel.rndf(*BULLET_VY_RANGE)
-    bullet.vx = pyxel.rndf(*BULLET_VX_RANGE)
+def _new_bullet() -> Entity:
+    bullet = Entity(Rect(0, 0, BULLET_W, BULLET_H))
+    bullet.frame_manager = bullet_animation()
     return bullet
 
 
-def make_player_bullets(player_rect: Rect):
-    times = pyxel.rndi(1, 3)
-    return {_make_bullet(player_rect) for _ in range(times)}
+def bullet_pool() -> EntityPool:
+    """A new pool of bullets, for `make_player_bullets`."""
+    return EntityPool(_new_bullet)
+
+
+def _make_bullet(player_rect: Rect, rng: Rng, pool: EntityPool):
+    x = rng.rndf(player_rect.left, player_rect.left + player_rect.w / 2 - BULLET_W)
+
+    bullet = pool.acquire()
+    bullet.rect.x = x
+    bullet.rect.y = player_rect.bottom
+    bullet.vy = rng.rndf(*BULLET_VY_RANGE)
+    bullet.vx = rng.rndf(*BULLET_VX_RANGE)
+    return bullet
+
+
+def make_player_bullets(player_rect: Rect, rng: Rng, pool: EntityPool):
+    times = rng.rndi(1, MAX_BULLETS)
+    return [_make_bullet(player_rect, rng, pool) for _ in range(times)]
@@ -1,20 +1,39 @@
-import pyxel
+from functools import cache
 
 from src.core import consts
 from src.core.frame_manager import Frame, FrameManager
+from src.core.rng import Rng
 from src.entities.entity import Entity, Rect
+from src.entities.pool import EntityPool
 
 PROJECTILE_W = 15
 PROJECTILE_H = 7
 PROJECTILE_SPEED = 2.5
 
-FRAMES = (Frame(0, 0, 6 * consts.TILE_SIZE, PROJECTILE_W, PROJECTILE_H),)
 
+@cache
+def projectile_animation() -> FrameManager:
+    """The animation shared by all projectiles."""
+    return FrameManager((Frame(0, 0, 6 * consts.TILE_SIZE, PROJECTILE_W, PROJECTILE_H),))
 
-def make_projectile():
-    y = pyxel.rndi(consts.CEILING_Y, consts.FLOOR_Y - PROJECTILE_H)
 
-    proj = Entity(Rect(consts.W, y, PROJECTILE_W, PROJECTILE_H))
-    proj.frame_manager = FrameManager(FRAMES)
+def _new_projectile() -> Entity:
+    proj = Entity(Rect(consts.W, 0, PROJECTILE_W, PROJECTILE_H))
+    proj.frame_manager = projectile_animation()
     proj.vx = -PROJECTILE_SPEED
+    proj.kind = "projectile"
+    return proj
+
+
+def projectile_pool() -> EntityPool:
+    """A new pool of projectiles, for `make_projectile`."""
+    return EntityPool(_new_projectile)
+
+
+def make_projectile(rng: Rng, pool: EntityPool):
+    y = rng.rndi(consts.CEILING_Y, consts.FLOOR_Y - PROJECTILE_H)
+
+    proj = pool.acquire()
+    proj.rect.x = consts.W
+    proj.rect.y = y
     return proj
@@ -1,27 +1,55 @@
-from typing import Literal
-
-import pyxel
+from functools import cache
+from typing import Literal, cast
 
+from src.core import consts
 from src.core.consts import TILE_SIZE
 from src.core.frame_manager import Frame, FrameManager
 from src.entities.entity import Entity, Rect
+from src.entities.pool import EntityPool
 
 SCIENTIST_W = 9
 SCIENTIST_H = 14
 
 
+@cache
+def walk_frames(direction: Literal[1, -1]) -> tuple[Frame, ...]:
+    """The walking animation in the given direction, built on first use."""
+    w = SCIENTIST_W * direction
+    return tuple(Frame(0, TILE_SIZE * i, TILE_SIZE * 2, w, SCIENTIST_H) for i in range(6))
+
+
 class Scientist(Entity):
     W = SCIENTIST_W
     H = SCIENTIST_H
     SPEED = 1
-    FRAMES = tuple(Frame(0, TILE_SIZE * i, TILE_SIZE * 2, SCIENTIST_W, SCIENTIST_H) for i in range(6))
-    REVERSED_FRAMES = tuple(Frame(0, TILE_SIZE * i, TILE_SIZE * 2, -SCIENTIST_W, SCIENTIST_H) for i in range(6))
+
+    __slots__ = ("walk_left", "walk_right")
 
     def __init__(self, direction: Literal[1, -1] = 1):
-        super().__init__(Rect(pyxel.width, pyxel.height * 4 / 5 - self.H + 3, self.W, self.H))
+        super().__init__(Rect(0, 0, self.W, self.H))
+        self.walk_right = FrameManager(walk_frames(1))
+        self.walk_left = FrameManager(walk_frames(-1))
+        self.reset(direction)
+
+    def reset(self, direction: Literal[1, -1] = 1):
+        """Place the scientist at the right edge of the screen, walking in the given direction."""
+        self.rect.x = consts.W
+        self.rect.y = consts.H * 4 / 5 - self.H + 3
         if direction == 1:
-            self.frame_manager = FrameManager(self.FRAMES)
+            self.frame_manager = self.walk_right
             self.vx = self.SPEED
         else:
-            self.frame_manager = FrameManager(self.REVERSED_FRAMES)
+            self.frame_manager = self.walk_left
             self.vx = -self.SPEED
+        self.frame_manager.reset()
+
+
+def scientist_pool() -> EntityPool:
+    """A new pool of scientists, for `make_scientist`."""
+    return EntityPool(Scientist)
+
+
+def make_scientist(pool: EntityPool, direction: Literal[1, -1] = 1) -> Scientist:
+    scientist = cast("Scientist", pool.acquire())
+    scientist.reset(direction)
+    return scientist
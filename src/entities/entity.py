@@ -1,13 +1,19 @@
 from collections.abc import Iterable
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 import pyxel
 
 from src.core.frame_manager import FrameManager
 
+if TYPE_CHECKING:
+    from src.core.render_queue import RenderQueue
 
-@dataclass
+    from .mask import CollisionMask
+    from .pool import EntityPool
+
+
+@dataclass(slots=True)
 class Rect:
     """
     Represents a rectangle with a position (x, y) and a size (w, h).
@@ -64,18 +70,25 @@ class HitBox:
     Represents a collision box relative to an entity's position.
 
     Requires a reference to the entity before use.
+    The absolute bounds (left, top, right, bottom) are cached, and kept in sync by the entity.
     """
 
     NO_ENTITY_MSG = "HitBox must be associated with an Entity before use."
 
+    __slots__ = ("_entity", "_h", "_w", "bottom", "left", "relative_rect", "relative_x", "relative_y", "right", "top")
+
     def __init__(self, x: float, y: float, w: float, h: float):
+        self._entity: Entity | None = None
         self.relative_x: float = x
         self.relative_y: float = y
         self._w: float = w
         self._h: float = h
         self.relative_rect = Rect(x, y, w, h)
 
-    _entity: "Entity | None" = None
+        self.left: float = x
+        self.top: float = y
+        self.right: float = x + w
+        self.bottom: float = y + h
 
     @property
     def entity(self) -> "Entity":
@@ -87,23 +100,42 @@ class HitBox:
     def entity(self, value: "Entity"):
         self._entity = value
 
+    def place(self, x: float, y: float):
+        """Set the absolute bounds for an entity at (x, y)."""
+        self.left = self.relative_x + x
+        self.top = self.relative_y + y
+        self.right = self.left + self._w
+        self.bottom = self.top + self._h
+
+    def overlaps(self, other: "HitBox", other_dx: float = 0) -> bool:
+        """
+        Test the cached bounds, without syncing them first.
+
+            other_dx: Added to the other hitbox's x, to bring it into this hitbox's coordinate space.
+        """
+        return (
+            self.left <= other.right + other_dx
+            and self.right >= other.left + other_dx
+            and self.top <= other.bottom
+            and self.bottom >= other.top
+        )
+
     def collides(self, other: "HitBox") -> bool:
-        r1: Rect = self.abs_rect
-        r2 = other.abs_rect
-        return r1.left <= r2.right and r1.right >= r2.left and r1.top <= r2.bottom and r1.bottom >= r2.top
+        self.entity.sync_hitboxes()
+        other.entity.sync_hitboxes()
+        return self.overlaps(other)
 
     @property
     def abs_rect(self):
-        x = self.relative_rect.x + self.entity.rect.x
-        y = self.relative_rect.y + self.entity.rect.y
-        return Rect(x, y, self._w, self._h)
+        self.entity.sync_hitboxes()
+        return Rect(self.left, self.top, self._w, self._h)
 
     def debug_draw(self, color: int = 9) -> None:
         r = self.abs_rect
         pyxel.rect(r.x, r.y, r.w, r.h, color)
 
 
-@dataclass
+@dataclass(slots=True)
 class EntityPart:
     """
     Represents a single part of an entity.
@@ -130,8 +162,28 @@ class Entity:
 
     Both kinds of entities can have multiple hitboxes. If no hitbox is provided,
     the entity gets a default hitbox based on its dimensions.
+
+    Hitbox bounds are synced lazily, recomputed from the entity's position when it changed since the last sync,
+    so the rect may be moved or set directly.
+
+    An entity may also have a collision mask, aligned with its rect, which replaces its hitboxes
+    in the narrow phase of collisions with entities that don't have one.
     """
 
+    __slots__ = (
+        "_synced_x",
+        "_synced_y",
+        "hitbox_bounds",
+        "hitboxes",
+        "kind",
+        "mask",
+        "parts",
+        "pool",
+        "rect",
+        "vx",
+        "vy",
+    )
+
     def __init__(
         self,
         rect: Rect,
@@ -143,10 +195,24 @@ class Entity:
         self.hitboxes = hitboxes or [HitBox(0, 0, self.rect.w, self.rect.h)]
         self.vx: float = 0
         self.vy: float = 0
+        self.pool: EntityPool | None = None  # The pool the entity was acquired from, if any
+        self.kind: str = type(self).__name__.lower()  # What made the entity, for statistics
+        self.mask: CollisionMask | None = None
 
         for hitbox in self.hitboxes:
             hitbox.entity = self
 
+        # Bounding box of all hitboxes, relative to the entity's position
+        self.hitbox_bounds: tuple[float, float, float, float] = (
+            min(hitbox.relative_x for hitbox in self.hitboxes),
+            min(hitbox.relative_y for hitbox in self.hitboxes),
+            max(hitbox.relative_x + hitbox._w for hitbox in self.hitboxes),  # noqa: SLF001
+            max(hitbox.relative_y + hitbox._h for hitbox in self.hitboxes),  # noqa: SLF001
+        )
+        # Position the hitboxes were last synced to
+        self._synced_x: float = 0
+        self._synced_y: float = 0
+
     @property
     def frame_manager(self) -> FrameManager:
         """Convenience property to access the main part's frame manager."""
@@ -157,18 +223,54 @@ class Entity:
         """Convenience property to set the main part's frame manager."""
         self.parts[0].frame_manager = value
 
-    def collides(self, other: "Entity") -> bool:
+    def sync_hitboxes(self):
+        """Bring the cached hitbox bounds up to date with the entity's position."""
+        x, y = self.rect.x, self.rect.y
+        if x != self._synced_x or y != self._synced_y:
+            for hitbox in self.hitboxes:
+                hitbox.place(x, y)
+            self._synced_x, self._synced_y = x, y
+
+    def collides(self, other: "Entity", other_dx: float = 0) -> bool:
+        """
+        Test whether any of the entities' hitboxes overlap.
+
+        If either entity has a collision mask, it is tested against the other's hitboxes instead.
+
+            other_dx: Added to the other entity's x, to bring it into this entity's coordinate space,
+                e.g. between world and screen space.
+        """
+        # Early out if the bounding boxes of all hitboxes don't overlap
+        left, top, right, bottom = self.hitbox_bounds
+        other_left, other_top, other_right, other_bottom = other.hitbox_bounds
+        x, y, other_x, other_y = self.rect.x, self.rect.y, other.rect.x + other_dx, other.rect.y
+        if (
+            x + left > other_x + other_right
+            or x + right < other_x + other_left
+            or y + top > other_y + other_bottom
+            or y + bottom < other_y + other_top
+        ):
+            return False
+
+        self.sync_hitboxes()
+        other.sync_hitboxes()
+        if other.mask is not None:
+            return any(
+                other.mask.overlaps_rect(hb.left - other_x, hb.top - other_y, hb.right - other_x, hb.bottom - other_y)
+                for hb in self.hitboxes
+            )
+        if self.mask is not None:
+            return any(
+                self.mask.overlaps_rect(hb.left + other_dx - x, hb.top - y, hb.right + other_dx - x, hb.bottom - y)
+                for hb in other.hitboxes
+            )
         return any(
-            self_hitbox.collides(other_hitbox) for self_hitbox in self.hitboxes for other_hitbox in other.hitboxes
+            self_hitbox.overlaps(other_hitbox, other_dx)
+            for self_hitbox in self.hitboxes
+            for other_hitbox in other.hitboxes
         )
 
     def update(self):
-        # Extract unique FrameManager instances from parts
-        unique_frame_managers = {part.frame_manager for part in self.parts}
-        # Ensure the frames stay in sync by only updating unique frame managers
-        for frame_manager in unique_frame_managers:
-            frame_manager.update()
-
         self.move(self.vx, self.vy)
 
     def move(self, dx: float, dy: float):
@@ -177,11 +279,13 @@ class Entity:
         self.rect.x += dx
         self.rect.y += dy
 
-    def draw(self, *, debug: Literal["bounding box", "hitboxes", "all"] | None = None):
+    def draw(self, dx: float = 0, dy: float = 0, *, debug: Literal["bounding box", "hitboxes", "all"] | None = None):
         """
         Draw the entity on the screen.
 
         Args:
+            dx: Added to the entity's x when drawing its parts, e.g. to interpolate its position.
+            dy: Added to the entity's y when drawing its parts.
             debug: Optional debug mode. Can be one of:
                 - "bounding box": Draw the entity's bounding box.
                 - "hitboxes": Draw the entity's hitboxes.
@@ -197,4 +301,16 @@ class Entity:
 
         for part in self.parts:
             offset_x, offset_y = part.offset
-            part.frame_manager.draw(self.rect.x + offset_x, self.rect.y + offset_y)
+            part.frame_manager.draw(self.rect.x + dx + offset_x, self.rect.y + dy + offset_y)
+
+    def submit(self, queue: "RenderQueue", dx: float = 0, dy: float = 0):
+        """
+        Submit the entity's parts to a render queue, instead of drawing them directly.
+
+            dx: Added to the entity's x, e.g. to transform it from world to screen space.
+            dy: Added to the entity's y.
+        """
+        x, y = self.rect.x + dx, self.rect.y + dy
+        for part in self.parts:
+            offset_x, offset_y = part.offset
+            queue.submit(x + offset_x, y + offset_y, part.frame_manager.frame)
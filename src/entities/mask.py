@@ -0,0 +1,80 @@
+from math import ceil, floor
+
+import pyxel
+
+from src.core.frame_manager import Frame
+
+
+class CollisionMask:
+    """
+    A 1-bit mask of an entity's opaque pixels, for a pixel-accurate narrow phase.
+
+    Each row is stored as an int, with bit `c` set if column `c` is opaque.
+    Rectangles are tested against a summed-area table of the opaque pixels, built on first use,
+    so a test costs four lookups regardless of the rectangle's size.
+    Masks are baked once from the sprite sheet, and shared by every entity of the same layout.
+    """
+
+    __slots__ = ("_table", "height", "rows", "width")
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rows: list[int] = [0] * height
+        self._table: list[int] | None = None
+
+    @classmethod
+    def from_frame(cls, frame: Frame, image: pyxel.Image | None = None) -> "CollisionMask":
+        """
+        Bake the opaque pixels of a frame, as it would be drawn by `pyxel.blt`.
+
+        Negative sizes flip the frame, like in `pyxel.blt`.
+        Rotation and scale are not supported.
+            image: The image to read from, instead of the frame's image bank.
+        """
+        if image is None:
+            image = pyxel.images[frame.img] if isinstance(frame.img, int) else frame.img
+        w, h = int(abs(frame.w)), int(abs(frame.h))
+        u, v = int(frame.u), int(frame.v)
+        mask = cls(w, h)
+        for y in range(h):
+            src_y = v + (h - 1 - y if frame.h < 0 else y)
+            row = 0
+            for x in range(w):
+                src_x = u + (w - 1 - x if frame.w < 0 else x)
+                if image.pget(src_x, src_y) != frame.colkey:
+                    row |= 1 << x
+            mask.rows[y] = row
+        return mask
+
+    def add(self, other: "CollisionMask", x: int, y: int):
+        """Combine another mask into this one, with its top-left corner at (x, y)."""
+        clip = (1 << self.width) - 1
+        for j, row in enumerate(other.rows):
+            if 0 <= y + j < self.height:
+                self.rows[y + j] |= (row << x if x >= 0 else row >> -x) & clip
+        self._table = None
+
+    def _summed_area_table(self) -> list[int]:
+        """The number of opaque pixels above and left of every (x, y), flattened by rows of `width + 1`."""
+        stride = self.width + 1
+        table = [0] * (stride * (self.height + 1))
+        for y, row in enumerate(self.rows):
+            opaque = 0
+            for x in range(self.width):
+                opaque += row >> x & 1
+                table[(y + 1) * stride + x + 1] = table[y * stride + x + 1] + opaque
+        return table
+
+    def overlaps_rect(self, left: float, top: float, right: float, bottom: float) -> bool:
+        """Test whether any opaque pixel lies within a rectangle, relative to the mask's top-left corner."""
+        x0, x1 = max(0, floor(left)), min(self.width, ceil(right))
+        y0, y1 = max(0, floor(top)), min(self.height, ceil(bottom))
+        if x0 >= x1 or y0 >= y1:
+            return False
+        table = self._table
+        if table is None:
+            table = self._table = self._summed_area_table()
+        stride = self.width + 1
+        top_row, bottom_row = y0 * stride, y1 * stride
+        return table[bottom_row + x1] - table[top_row + x1] - table[bottom_row + x0] + table[top_row + x0] > 0
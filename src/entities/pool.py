@@ -0,0 +1,32 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .entity import Entity
+
+DEFAULT_MAX_SIZE = 256
+
+
+class EntityPool:
+    """
+    Recycles entities of a single kind, to avoid allocating new ones for every spawn.
+
+    Entities acquired from a pool remember it, and are released back into it
+    when they are removed from an EntityCollection. A recycled entity keeps its old state,
+    so its factory is responsible for resetting it after `acquire`.
+    """
+
+    def __init__(self, create: Callable[[], "Entity"], max_size: int = DEFAULT_MAX_SIZE):
+        self.create = create
+        self.max_size = max_size
+        self.free: list[Entity] = []
+
+    def acquire(self) -> "Entity":
+        entity = self.free.pop() if self.free else self.create()
+        entity.pool = self
+        return entity
+
+    def release(self, entity: "Entity"):
+        entity.pool = None  # Guards against releasing the same entity twice
+        if len(self.free) < self.max_size:
+            self.free.append(entity)